@@ -0,0 +1,62 @@
+"""
+比较两种 Markdown 输入后端的耗时：
+
+- html：md2html_str 序列化为 HTML，再由 BeautifulSoup 重新解析（DocxProcessor.render）
+- tree：md2tree 直接取 Python-Markdown 的元素树（DocxProcessor.render_tree）
+
+用法：
+    python benchmarks/bench_backends.py [重复次数] [轮数]
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from markdocx.parser.md_parser import md2html_str, md2tree  # noqa: E402
+from markdocx.provider.docx_processor import DocxProcessor  # noqa: E402
+
+EXAMPLE = Path(__file__).parent.parent / "examples" / "example.md"
+
+
+def make_document(repeat: int) -> str:
+    # 去掉网络图片，避免测到网络耗时
+    text = "\n".join(line for line in EXAMPLE.read_text(encoding="utf-8").splitlines()
+                     if "http" not in line or not line.startswith("!["))
+    return "\n\n".join(text for _ in range(repeat))
+
+
+def bench_html(text: str, base_dir: str):
+    start = time.perf_counter()
+    body_tag = BeautifulSoup(md2html_str(text), 'html.parser').contents[2]
+    parsed = time.perf_counter()
+    DocxProcessor(style_conf=None).render_tree(body_tag, base_dir=base_dir)
+    return parsed - start, time.perf_counter() - start
+
+
+def bench_tree(text: str, base_dir: str):
+    start = time.perf_counter()
+    body = md2tree(text)
+    parsed = time.perf_counter()
+    DocxProcessor(style_conf=None).render_tree(body, base_dir=base_dir)
+    return parsed - start, time.perf_counter() - start
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    text = make_document(repeat)
+    base_dir = str(EXAMPLE.parent)
+    print("document: %d lines, %d KiB" % (text.count("\n") + 1, len(text.encode("utf-8")) // 1024))
+
+    for name, func in (("html", bench_html), ("tree", bench_tree)):
+        results = [func(text, base_dir) for _ in range(rounds)]
+        parse = min(r[0] for r in results)
+        total = min(r[1] for r in results)
+        print("%-5s md->tree %.3fs  total %.3fs" % (name, parse, total))
+
+
+if __name__ == '__main__':
+    main()
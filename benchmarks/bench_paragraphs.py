@@ -0,0 +1,98 @@
+"""
+比较两种段落格式设置方式的单个元素耗时：
+
+- legacy：add_paragraph(style=...) 后逐个设置 paragraph_format、run.font 的属性（原先的实现）
+- template：ParagraphTemplates 复制预先构造好的 w:pPr / w:rPr 模板
+
+用法：
+    python benchmarks/bench_paragraphs.py [元素数...]
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from docx.enum.text import WD_PARAGRAPH_ALIGNMENT  # noqa: E402
+from docx.shared import Pt  # noqa: E402
+
+from markdocx.provider.docx_processor import DocxProcessor  # noqa: E402
+from markdocx.provider.run_builder import RunBuilder  # noqa: E402
+from markdocx.utils.style_enum import MDX_STYLE  # noqa: E402
+
+_CODE = frozenset(("code",))
+CODE = "def block():\n    value = compute(1)  # comment\n    return value"
+
+
+def legacy_code_block(document):
+    p = document.add_paragraph(style=MDX_STYLE.PLAIN_TEXT)
+    p.add_run(CODE).font.name = "Consolas"
+    p.paragraph_format.first_line_indent = 0
+    p.paragraph_format.left_indent = Pt(20)
+    p.paragraph_format.space_before = Pt(10)
+    p.paragraph_format.space_after = Pt(10)
+
+
+def template_code_block(paragraphs):
+    paragraphs.add_paragraph(CODE, style=MDX_STYLE.PLAIN_TEXT, fmt="code", formats=_CODE)
+
+
+def legacy_list_item(document):
+    document.add_paragraph("list item", style=MDX_STYLE.LIST_BULLET)
+
+
+def template_list_item(paragraphs):
+    paragraphs.add_paragraph("list item", style=MDX_STYLE.LIST_BULLET)
+
+
+def legacy_todo_item(document):
+    p = document.add_paragraph(style=MDX_STYLE.PLAIN_LIST)
+    p.add_run("[ √ ]").font.name = "Consolas"
+    p.add_run(" todo item")
+
+
+def template_todo_item(paragraphs):
+    runs = RunBuilder(paragraphs.add_paragraph(style=MDX_STYLE.PLAIN_LIST))
+    runs.add("[ √ ]", _CODE)
+    runs.add(" todo item")
+    runs.flush()
+
+
+def legacy_caption(document):
+    p = document.add_paragraph("image caption", style=MDX_STYLE.CAPTION)
+    p.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+    p.paragraph_format.first_line_indent = 0
+
+
+def template_caption(paragraphs):
+    paragraphs.add_paragraph("image caption", style=MDX_STYLE.CAPTION, fmt="centered")
+
+
+CASES = {
+    "code_block": (legacy_code_block, template_code_block),
+    "list_item": (legacy_list_item, template_list_item),
+    "todo_item": (legacy_todo_item, template_todo_item),
+    "caption": (legacy_caption, template_caption),
+}
+
+
+def bench(func, target, n: int) -> float:
+    """n 个元素的平均耗时（微秒）"""
+    start = time.perf_counter()
+    for _ in range(n):
+        func(target)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main():
+    sizes = [int(n) for n in sys.argv[1:]] or [1000, 5000]
+    print("%-11s %6s %12s %12s %8s" % ("element", "n", "legacy us", "template us", "speedup"))
+    for name, (legacy, template) in CASES.items():
+        for size in sizes:
+            legacy_us = bench(legacy, DocxProcessor().document, size)
+            template_us = bench(template, DocxProcessor().paragraphs, size)
+            print("%-11s %6d %12.1f %12.1f %7.1fx" % (name, size, legacy_us, template_us, legacy_us / template_us))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+比较两种表格构建方式随行数增长的耗时：
+
+- legacy：python-docx 的 table.add_row().cells 逐个单元格赋值（原先的 add_table）
+- bulk：TableBuilder 复制预先构造好的行模板
+
+用法：
+    python benchmarks/bench_tables.py [列数] [行数...]
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from docx import Document  # noqa: E402
+
+from markdocx.parser.md_parser import md2tree  # noqa: E402
+from markdocx.provider.docx_processor import DocxProcessor  # noqa: E402
+from markdocx.provider.table_builder import TableBuilder  # noqa: E402
+
+
+def make_rows(rows: int, cols: int):
+    return [["r%dc%d" % (r, c) for c in range(cols)] for r in range(rows)]
+
+
+def bench_legacy(rows):
+    table = Document().add_table(0, len(rows[0]))
+    start = time.perf_counter()
+    for texts in rows:
+        cells = table.add_row().cells
+        for i, text in enumerate(texts):
+            cells[i].text = text
+    return time.perf_counter() - start
+
+
+def bench_bulk(rows):
+    table = Document().add_table(0, len(rows[0]))
+    start = time.perf_counter()
+    TableBuilder(table).add_rows(rows)
+    return time.perf_counter() - start
+
+
+def bench_markdown(rows):
+    """从 Markdown 到文档的完整耗时"""
+    header = "| " + " | ".join("h%d" % i for i in range(len(rows[0]))) + " |\n"
+    header += "|" + "---|" * len(rows[0]) + "\n"
+    body = md2tree(header + "".join("| " + " | ".join(texts) + " |\n" for texts in rows))
+    start = time.perf_counter()
+    DocxProcessor().render_tree(body)
+    return time.perf_counter() - start
+
+
+def main():
+    cols = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    sizes = [int(n) for n in sys.argv[2:]] or [500, 1000, 2000, 4000]
+    print("%6s %10s %10s %10s %14s" % ("rows", "legacy", "bulk", "markdown", "bulk us/cell"))
+    for size in sizes:
+        rows = make_rows(size, cols)
+        # 原实现是平方复杂度，行数较多时跳过
+        legacy = "%9.3fs" % bench_legacy(rows) if size <= 1000 else "%10s" % "-"
+        bulk = bench_bulk(rows)
+        print("%6d %s %9.3fs %9.3fs %14.1f" % (size, legacy, bulk, bench_markdown(rows),
+                                               bulk / (size * cols) * 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -8,14 +8,24 @@ setup(
     install_requires=[
         "python-docx==0.8.11",
         "Markdown>=3.4.0",
-        "beautifulsoup4==4.10.0",
         "PyYAML>=5.4.1",
         "requests>=2.25.1"
     ],
+    extras_require={
+        # 仅在转换 HTML 文件（DocxProcessor.html2docx）时需要
+        "html": ["beautifulsoup4==4.10.0"],
+        # 图片优化（样式配置中的 image.optimize）
+        "images": ["Pillow>=8.0"],
+        # MarkDocx.aconvert 中用 asyncio 并发下载网络图片
+        "async": ["aiohttp>=3.7"],
+    },
+    entry_points={
+        "console_scripts": ["markdocx=markdocx.cli:main"],
+    },
     package_data={
         'markdocx': ['config/*.yaml'],
     },
-    python_requires='>=3.6',
+    python_requires='>=3.7',
     author="Your Name",
     author_email="your.email@example.com",
     description="Convert Markdown to Word documents with customizable styles",
@@ -1,92 +1,50 @@
 """
 MarkDocx - Convert Markdown to Word documents with customizable styles
+
+`import markdocx` 只加载本文件：python-docx、Python-Markdown、PyYAML、requests 等依赖
+在第一次访问 MarkDocx 等名称时才导入，只用到命令行解析或部分接口时启动更快。
 """
+import logging
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+__version__ = "0.1.0"
+
+__all__ = ["MarkDocx", "BatchResult", "CompiledStyle", "ImageCache", "MemoryResultCache", "DirectoryResultCache",
+           "ConversionStats"]
+
+# 公开名称 -> 所在模块，第一次访问时才导入（PEP 562）
+_LAZY_ATTRS = {
+    "MarkDocx": ".converter",
+    "BatchResult": ".batch",
+    "CompiledStyle": ".provider.style_cache",
+    "ImageCache": ".provider.image_cache",
+    "MemoryResultCache": ".provider.result_cache",
+    "DirectoryResultCache": ".provider.result_cache",
+    "ConversionStats": ".stats",
+}
+
+if TYPE_CHECKING:  # 供 IDE 和类型检查使用
+    from .batch import BatchResult
+    from .converter import MarkDocx
+    from .provider.image_cache import ImageCache
+    from .provider.result_cache import DirectoryResultCache, MemoryResultCache
+    from .provider.style_cache import CompiledStyle
+    from .stats import ConversionStats
+
+
+# 日志由使用者配置，未配置时不输出（命令行会配置输出到标准错误）
+logging.getLogger(__name__).addHandler(logging.NullHandler())
 
-from pathlib import Path
-import yaml
-from yaml import FullLoader
 
-from .parser.md_parser import md2html
-from .provider.docx_processor import DocxProcessor
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value  # 之后直接从模块字典中取
+    return value
 
 
-class MarkDocx:
-    def __init__(self, style_config=None):
-        """
-        初始化MarkDocx转换器
-        
-        Args:
-            style_config: 样式配置，可以是YAML文件路径或字典
-        """
-        self.style_config = {}
-        if style_config:
-            if isinstance(style_config, str):
-                with open(style_config, 'r', encoding='utf-8') as f:
-                    self.style_config = yaml.load(f, FullLoader)
-            elif isinstance(style_config, dict):
-                self.style_config = style_config
-            else:
-                raise ValueError("style_config must be a file path or dictionary")
-        else:
-            # 使用默认样式
-            default_style = Path(__file__).parent / "config" / "default_style.yaml"
-            if default_style.exists():
-                with open(default_style, 'r', encoding='utf-8') as f:
-                    self.style_config = yaml.load(f, FullLoader)
-        
-        self.processor = DocxProcessor(style_conf=self.style_config)
-    
-    def convert(self, input_path, output_path=None, auto_open=False):
-        """
-        转换Markdown文件到Word文档
-        
-        Args:
-            input_path: Markdown文件路径
-            output_path: 输出Word文件路径，默认为输入文件同目录
-            auto_open: 是否自动打开生成的文件
-            
-        Returns:
-            输出文件路径
-        """
-        input_path = Path(input_path)
-        if not input_path.exists():
-            raise FileNotFoundError(f"Input file not found: {input_path}")
-        
-        if output_path is None:
-            output_path = input_path.with_suffix('.docx')
-        else:
-            output_path = Path(output_path)
-        
-        # 转换过程
-        html_path = input_path.with_suffix('.html')
-        md2html(str(input_path), str(html_path))
-        
-        try:
-            self.processor.html2docx(str(html_path), str(output_path))
-            if auto_open and output_path.exists():
-                import os
-                os.startfile(str(output_path.absolute()))
-            return output_path
-        finally:
-            # 清理临时HTML文件
-            if html_path.exists():
-                html_path.unlink()
-    
-    def convert_string(self, markdown_string, output_path):
-        """
-        转换Markdown字符串到Word文档
-        
-        Args:
-            markdown_string: Markdown内容
-            output_path: 输出Word文件路径
-            
-        Returns:
-            输出文件路径
-        """
-        temp_md = Path('temp.md')
-        try:
-            temp_md.write_text(markdown_string, encoding='utf-8')
-            return self.convert(temp_md, output_path)
-        finally:
-            if temp_md.exists():
-                temp_md.unlink() 
\ No newline at end of file
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
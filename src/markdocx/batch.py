@@ -0,0 +1,157 @@
+"""
+批量转换：用进程池并行转换大量 Markdown 文件
+"""
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+# 每个工作进程各自持有一个转换器，样式配置只在进程启动时加载一次
+_worker_converter = None
+
+
+class BatchResult(NamedTuple):
+    """单个文件的转换结果"""
+    input: Path
+    output: Optional[Path]
+    error: Optional[str] = None
+    seconds: float = 0.0
+    stats: Optional[dict] = None  # ConversionStats.to_dict() 的结果，失败时为出错前已完成的部分
+    diagnostics: Tuple[str, ...] = ()  # 转换中产生的警告，失败时包含出错前的警告
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def expand_inputs(inputs: Iterable) -> List[Tuple[Path, Path]]:
+    """
+    展开输入，返回 (Markdown 文件, 相对输出目录的路径) 列表
+
+    输入可以是文件、目录（递归查找其中的 .md 文件，保留目录结构）或 glob 通配符
+    （保留相对于第一个通配符之前的目录的结构，如 docs/**/*.md 中的 docs）。
+    """
+    files = []
+    seen = set()
+
+    def add(path: Path, relative: Path):
+        key = path.resolve()
+        if key not in seen:
+            seen.add(key)
+            files.append((path, relative))
+
+    for item in inputs:
+        item = str(item)
+        if os.path.isdir(item):
+            root = Path(item)
+            for path in sorted(root.rglob("*.md")):
+                add(path, path.relative_to(root))
+        elif glob.has_magic(item):
+            root = _glob_root(item)
+            for match in sorted(glob.glob(item, recursive=True)):
+                if os.path.isfile(match):
+                    add(Path(match), Path(os.path.relpath(match, root)))
+        else:
+            add(Path(item), Path(Path(item).name))
+    return files
+
+
+def _glob_root(pattern: str) -> str:
+    """glob 通配符中不含通配符的前缀目录"""
+    parts = []
+    for part in Path(pattern).parts[:-1]:
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    return os.path.join(*parts) if parts else os.curdir
+
+
+def output_path_for(input_path: Path, relative: Path, out_dir=None) -> Path:
+    """输出路径：指定 out_dir 时保留相对路径，否则放在输入文件旁边"""
+    if out_dir is None:
+        return input_path.with_suffix(".docx")
+    return Path(out_dir) / relative.with_suffix(".docx")
+
+
+def _check_outputs(jobs):
+    """多个输入对应同一个输出文件时，在开始转换前报错，避免互相覆盖或并发写入同一文件"""
+    inputs = {}
+    for input_path, output_path in jobs:
+        inputs.setdefault(os.path.abspath(output_path), []).append(str(input_path))
+    conflicts = ["%s <- %s" % (output, ", ".join(paths)) for output, paths in inputs.items() if len(paths) > 1]
+    if conflicts:
+        raise ValueError("multiple inputs map to the same output: " + "; ".join(conflicts))
+
+
+def _init_worker(style_config, options):
+    global _worker_converter
+    from . import MarkDocx
+    from .diagnostics import silence
+    silence()  # 警告记入各文件的 BatchResult.diagnostics，由主进程统一报告
+    _worker_converter = MarkDocx(style_config=style_config, **options)
+
+
+def _convert_one(converter, input_path: Path, output_path: Path) -> BatchResult:
+    from .stats import ConversionStats
+
+    start = time.perf_counter()
+    stats = ConversionStats()
+    try:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        converter.convert(input_path, output_path, stats=stats)
+    except Exception as e:
+        return BatchResult(input_path, None, "%s: %s" % (type(e).__name__, e), time.perf_counter() - start,
+                           stats.to_dict(), tuple(stats.diagnostics))
+    return BatchResult(input_path, output_path, None, time.perf_counter() - start,
+                       stats.to_dict(), tuple(stats.diagnostics))
+
+
+def _convert_in_worker(input_path: Path, output_path: Path) -> BatchResult:
+    return _convert_one(_worker_converter, input_path, output_path)
+
+
+def convert_many(inputs: Iterable, out_dir=None, style_config=None, workers: int = None,
+                 converter=None, options: dict = None) -> Iterator[BatchResult]:
+    """
+    并行转换多个 Markdown 文件，按完成顺序逐个返回结果
+
+    单个文件失败不会中断整个批次，错误记录在 BatchResult.error 中。
+
+    Args:
+        inputs: 文件、目录或 glob 通配符
+        out_dir: 输出目录，默认输出到各输入文件旁边
+        style_config: 样式配置（YAML / .mdxs 路径、字典或 CompiledStyle），在每个工作进程中加载一次
+        workers: 进程数，默认为 CPU 核数；为 1 时在当前进程中顺序转换
+        converter: workers 为 1 时使用的 MarkDocx 实例，默认按 style_config 新建
+        options: 创建 MarkDocx 时的其他参数，如 image_cache
+
+    Raises:
+        ValueError: 指定了 out_dir 且多个输入对应同一个输出文件，调用时即抛出，不会转换任何文件
+    """
+    jobs = [(path, output_path_for(path, relative, out_dir)) for path, relative in expand_inputs(inputs)]
+    _check_outputs(jobs)
+    return _run(jobs, style_config, workers, converter, options or {})
+
+
+def _run(jobs, style_config, workers, converter, options) -> Iterator[BatchResult]:
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(jobs) <= 1:
+        if converter is None:
+            from . import MarkDocx
+            converter = MarkDocx(style_config=style_config, **options)
+        for input_path, output_path in jobs:
+            yield _convert_one(converter, input_path, output_path)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), initializer=_init_worker,
+                             initargs=(style_config, options)) as executor:
+        futures = {executor.submit(_convert_in_worker, input_path, output_path): input_path
+                   for input_path, output_path in jobs}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:  # 工作进程异常退出等
+                yield BatchResult(futures[future], None, "%s: %s" % (type(e).__name__, e))
@@ -0,0 +1,244 @@
+"""
+基准测试：markdocx bench
+
+用合成的大文档分别压测各条热点路径（混合行内样式的段落、大表格、多层列表、代码块、TODO 列表、本地图片、超链接），
+对每个场景分阶段统计耗时和内存峰值：
+
+- parse：Markdown -> 元素树（md2tree）
+- render：元素树 -> python-docx 文档（render_tree）
+- save：序列化为 .docx（to_bytes）
+
+内存峰值在 Linux 上是进程常驻内存（VmHWM，每个阶段开始前清零，包含 lxml 的分配）的增量，
+其他平台上退回到 tracemalloc 统计的 Python 堆峰值。
+"""
+import json
+import os
+import re
+import struct
+import tempfile
+import time
+import tracemalloc
+import zlib
+from typing import Callable, Dict, List, NamedTuple
+
+STAGES = ("parse", "render", "save")
+
+
+# ---------- 合成文档 ----------
+
+def gen_paragraphs(n: int, base_dir: str = None) -> str:
+    """n 个混合了加粗、斜体、下划线、删除线、行内代码的段落"""
+    return "\n\n".join(
+        "第 %d 段 plain text **bold %d** and *italic* with <u>underline</u>, ~~strike~~, "
+        "`inline code` and more plain words to fill the line." % (i, i)
+        for i in range(n))
+
+
+def gen_tables(n: int, base_dir: str = None) -> str:
+    """一张 n 行 6 列的大表格，外加 n // 50 张 20 行的小表格"""
+    def table(rows: int, tag: str) -> str:
+        lines = ["| " + " | ".join("列%d" % c for c in range(6)) + " |", "|" + "---|" * 6]
+        lines += ["| " + " | ".join("%s r%dc%d" % (tag, r, c) for c in range(6)) + " |" for r in range(rows)]
+        return "\n".join(lines)
+
+    return "\n\n".join([table(n, "big")] + [table(20, "t%d" % i) for i in range(n // 50)])
+
+
+def gen_lists(n: int, base_dir: str = None) -> str:
+    """n 个三层嵌套的有序、无序列表项"""
+    blocks = []
+    for i in range(0, n, 10):
+        ordered = "\n".join("%d. item %d\n    1. sub %d\n        1. deep %d" % (j + 1, i + j, i + j, i + j)
+                            for j in range(5))
+        bullet = "\n".join("- item %d\n    - sub %d\n        - deep %d" % (i + j, i + j, i + j) for j in range(5))
+        blocks += [ordered, bullet]
+    return "\n\n".join(blocks)
+
+
+def gen_code(n: int, base_dir: str = None) -> str:
+    """n 个 10 行的代码块"""
+    code = "\n".join("    value_%d = compute(%d)  # comment" % (i, i) for i in range(10))
+    return "\n\n".join("```python\ndef block_%d():\n%s\n```" % (i, code) for i in range(n))
+
+
+def gen_todo(n: int, base_dir: str = None) -> str:
+    """n 个 TODO 列表项，每个列表 10 项，以标题隔开"""
+    return "\n\n".join("## todo %d\n\n" % i + "\n".join("- [%s] task %d" % ("x" if j % 2 else " ", j)
+                                                         for j in range(i, min(i + 10, n)))
+                       for i in range(0, n, 10))
+
+
+def gen_images(n: int, base_dir: str = None) -> str:
+    """引用 n 张内容各不相同的本地 PNG 图片，图片写入 base_dir"""
+    lines = []
+    for i in range(n):
+        name = "img_%d.png" % i
+        with open(os.path.join(base_dir, name), "wb") as file:
+            file.write(_png(64, 64, (i * 37 % 256, i * 91 % 256, i * 53 % 256)))
+        lines.append("![图 %d](%s)" % (i, name))
+    return "\n\n".join(lines)
+
+
+def gen_links(n: int, base_dir: str = None) -> str:
+    """n 个超链接，每段 5 个"""
+    return "\n\n".join(" ".join("[link %d](https://example.com/page/%d)" % (j, j) for j in range(i, i + 5))
+                       for i in range(0, n, 5))
+
+
+# 场景名 -> (生成函数, 默认规模)
+SCENARIOS: Dict[str, tuple] = {
+    "paragraphs": (gen_paragraphs, 5000),
+    "tables": (gen_tables, 5000),
+    "lists": (gen_lists, 3000),
+    "code": (gen_code, 2000),
+    "todo": (gen_todo, 3000),
+    "images": (gen_images, 200),
+    "links": (gen_links, 5000),
+}
+
+
+def _png(width: int, height: int, rgb: tuple) -> bytes:
+    """生成纯色 PNG，不依赖 Pillow"""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    raw = b"".join(b"\0" + bytes(rgb) * width for _ in range(height))
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b""))
+
+
+# ---------- 测量 ----------
+
+class _PeakMemory:
+    """统计一个阶段的内存峰值（字节）"""
+
+    _STATUS = "/proc/self/status"
+    _CLEAR_REFS = "/proc/self/clear_refs"
+
+    def __init__(self):
+        self.method = "rss" if self._can_reset_rss() else "tracemalloc"
+        self._base = 0
+
+    def _can_reset_rss(self) -> bool:
+        try:
+            self._reset_rss()
+            return self._rss("VmHWM") > 0
+        except (OSError, AttributeError):
+            return False
+
+    def _reset_rss(self):
+        with open(self._CLEAR_REFS, "w") as file:
+            file.write("5")  # 把 VmHWM 重置为当前的常驻内存
+
+    def _rss(self, field: str) -> int:
+        with open(self._STATUS, "r") as file:
+            return int(re.search(r"%s:\s+(\d+)" % field, file.read()).group(1)) * 1024
+
+    def start(self):
+        if self.method == "rss":
+            self._reset_rss()
+            self._base = self._rss("VmRSS")
+        else:
+            tracemalloc.start()
+
+    def stop(self) -> int:
+        if self.method == "rss":
+            return max(0, self._rss("VmHWM") - self._base)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak
+
+
+class StageResult(NamedTuple):
+    seconds: float  # 多轮中最快的一次
+    peak_bytes: int
+
+
+class ScenarioResult(NamedTuple):
+    name: str
+    size: int
+    markdown_bytes: int
+    docx_bytes: int
+    stages: Dict[str, StageResult]
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "size": self.size,
+            "markdown_bytes": self.markdown_bytes,
+            "docx_bytes": self.docx_bytes,
+            "stages": {stage: result._asdict() for stage, result in self.stages.items()},
+        }
+
+
+def run_scenario(name: str, generate: Callable, size: int, converter, rounds: int = 3) -> ScenarioResult:
+    """生成文档并分阶段测量 rounds 轮，耗时取最快的一轮，内存取最大值"""
+    from .parser.md_parser import md2tree
+
+    memory = _PeakMemory()
+    with tempfile.TemporaryDirectory(prefix="markdocx-bench-") as base_dir:
+        markdown_string = generate(size, base_dir)
+        seconds = {stage: float("inf") for stage in STAGES}
+        peaks = {stage: 0 for stage in STAGES}
+        data = b""
+
+        def measure(stage: str, func: Callable, *args):
+            memory.start()
+            start = time.perf_counter()
+            value = func(*args)
+            seconds[stage] = min(seconds[stage], time.perf_counter() - start)
+            peaks[stage] = max(peaks[stage], memory.stop())
+            return value
+
+        for _ in range(max(1, rounds)):
+            body = measure("parse", md2tree, markdown_string)
+            processor = converter._new_processor()
+            measure("render", processor.render_tree, body, base_dir)
+            data = measure("save", processor.to_bytes)
+            del body, processor
+
+    stages = {stage: StageResult(seconds[stage], peaks[stage]) for stage in STAGES}
+    return ScenarioResult(name, size, len(markdown_string.encode("utf-8")), len(data), stages)
+
+
+def run_bench(names: List[str] = None, scale: float = 1.0, rounds: int = 3, style_config=None,
+              report: Callable = None) -> List[ScenarioResult]:
+    """
+    运行基准测试
+
+    Args:
+        names: 要运行的场景，默认全部
+        scale: 各场景默认规模的倍数
+        rounds: 每个场景测量的轮数
+        style_config: 转换使用的样式，与 MarkDocx 相同
+        report: 每完成一个场景调用一次，参数为 ScenarioResult
+    """
+    from .converter import MarkDocx
+
+    converter = MarkDocx(style_config=style_config)
+    converter.convert_string("# markdocx\n\nwarm up")  # 完成 Markdown 解析器等的延迟初始化，不计入第一个场景
+    results = []
+    for name in names or list(SCENARIOS):
+        generate, size = SCENARIOS[name]
+        result = run_scenario(name, generate, max(1, int(size * scale)), converter, rounds=rounds)
+        results.append(result)
+        if report is not None:
+            report(result)
+    return results
+
+
+def format_row(result: ScenarioResult) -> str:
+    cells = ["%-11s %7d" % (result.name, result.size)]
+    for stage in STAGES:
+        stage_result = result.stages[stage]
+        cells.append("%8.3fs %7.1fMB" % (stage_result.seconds, stage_result.peak_bytes / 1024 / 1024))
+    return " ".join(cells)
+
+
+def format_header() -> str:
+    return "%-11s %7s " % ("scenario", "size") + " ".join("%18s" % stage for stage in STAGES)
+
+
+def to_json(results: List[ScenarioResult]) -> str:
+    return json.dumps({"memory": _PeakMemory().method, "results": [result.to_dict() for result in results]},
+                      indent=2)
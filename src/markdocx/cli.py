@@ -1,19 +1,13 @@
 import argparse
+import logging
 import os
 import sys
-
-import yaml
-from yaml import FullLoader
-
-sys.path.append('..')
-
-from src.parser.md_parser import md2html
 import time
 
-from src.provider.docx_processor import DocxProcessor
+from . import __version__
 
 config: dict = {
-    "version": "0.1.0"
+    "version": __version__
 }
 
 
@@ -26,38 +20,262 @@ def resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 
-if __name__ == '__main__':
-    if len(sys.argv) == 1:
-        sys.argv.append("-h")
+def default_style():
+    # 在打包成单文件exe后，直接以文件打开default_style.yaml会因为路径问题无法载入
+    # Pyinstaller 可以将资源文件一起bundle到exe中，
+    # 当exe在运行时，会生成一个临时文件夹，程序可通过sys._MEIPASS访问临时文件夹中的资源
+    # https://stackoverflow.com/questions/7674790/bundling-data-files-with-pyinstaller-onefile/13790741#13790741
+    if getattr(sys, 'frozen', False):
+        return resource_path(os.path.join("config", "default_style.yaml"))
+    return None  # 使用包内自带的默认样式
+
 
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="markdocx - %s" % config["version"])
-    parser.add_argument('input', help="Markdown file path")
-    parser.add_argument('-o', '--output', help="Optional. Path to save docx file")
+    parser.add_argument('input', nargs='+',
+                        help="Markdown file path. Several files, directories or glob patterns "
+                             "switch to batch mode")
+    parser.add_argument('-o', '--output',
+                        help="Optional. Path to save docx file, or output directory in batch mode")
     parser.add_argument('-s', '--style',
-                        help="Optional. YAML file with style configuration")
+                        help="Optional. YAML file with style configuration, or a style compiled with "
+                             "`markdocx compile-style`")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                        help="Optional. Number of worker processes in batch mode (default: CPU count)")
+    parser.add_argument('--image-cache', metavar="DIR",
+                        help="Optional. Directory to cache downloaded images between runs")
+    parser.add_argument('--result-cache', metavar="DIR",
+                        help="Optional. Directory to cache generated documents; unchanged inputs are not re-rendered")
+    parser.add_argument('--stream', action="store_true",
+                        help="Optional. Write document body while rendering to bound memory use on huge documents")
+    parser.add_argument('--profile', nargs='?', const="-", metavar="FILE",
+                        help="Optional. Write per-stage timings, element counts and bytes written as JSON "
+                             "to FILE, or to stdout instead of the progress messages")
+    parser.add_argument('-v', '--verbose', action="count", default=0,
+                        help="Optional. Log downloaded images (-v) and every rendered element (-vv) to stderr")
     parser.add_argument('-a', action="store_true",
                         help="Optional. Automatically open docx file when finished converting")
-    args = parser.parse_args()
-    docx_path = args.output if args.output is not None else args.input + ".docx"
+    return parser
 
-    start_time = time.time()  # 记录转换耗时
-    md2html(args.input, args.input + ".html")
-    # 在打包成单文件exe后，直接以文件打开default_style.yaml会因为路径问题无法载入
-    # Pyinstaller 可以将资源文件一起bundle到exe中，
-    # 当exe在运行时，会生成一个临时文件夹，程序可通过sys._MEIPASS访问临时文件夹中的资源
-    # https://stackoverflow.com/questions/7674790/bundling-data-files-with-pyinstaller-onefile/13790741#13790741
-    if not args.style:
-        args.style = resource_path(os.path.join("config", "default_style.yaml"))
 
-    with open(args.style, "r", encoding="utf-8") as file:
-        conf = yaml.load(file, FullLoader)
+def build_compile_style_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="markdocx compile-style",
+                                     description="Precompile a YAML style so conversions can skip YAML parsing")
+    parser.add_argument('style', help="YAML file with style configuration")
+    parser.add_argument('-o', '--output',
+                        help="Optional. Path to save the compiled style (default: STYLE with .mdxs suffix)")
+    return parser
+
+
+def compile_style(argv) -> int:
+    from .provider.style_cache import COMPILED_SUFFIX, load_style
+
+    args = build_compile_style_parser().parse_args(argv)
+    output = args.output or os.path.splitext(args.style)[0] + COMPILED_SUFFIX
+    load_style(args.style).save(output)
+    print("[SUCCESS] Compiled style saved to:", os.path.abspath(output))
+    return 0
+
+
+def build_serve_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="markdocx serve",
+                                     description="Run a local conversion server with warm worker processes. "
+                                                 "POST Markdown to /convert?style=ID to get .docx bytes back")
+    parser.add_argument('-s', '--style', action='append', default=[], metavar="[ID=]PATH",
+                        help="Optional, repeatable. Style (YAML or .mdxs) served under ID; "
+                             "without ID it replaces the built-in 'default' style")
+    parser.add_argument('--host', default="127.0.0.1", help="Optional. Address to listen on (default: 127.0.0.1)")
+    parser.add_argument('-p', '--port', type=int, default=8765, help="Optional. Port to listen on (default: 8765)")
+    parser.add_argument('--socket', metavar="PATH", help="Optional. Listen on a Unix socket instead of TCP")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                        help="Optional. Number of worker processes (default: CPU count)")
+    parser.add_argument('--max-queue', type=int, default=16,
+                        help="Optional. Requests allowed to wait for a worker before answering 503 (default: 16)")
+    parser.add_argument('--max-body', type=int, default=16 * 1024 * 1024,
+                        help="Optional. Largest accepted request body in bytes (default: 16 MiB)")
+    parser.add_argument('--image-cache', metavar="DIR",
+                        help="Optional. Directory to cache downloaded images between requests")
+    parser.add_argument('--image-root', metavar="DIR",
+                        help="Optional. Directory to resolve relative image paths in; "
+                             "the base_dir query parameter must stay inside it")
+    parser.add_argument('--result-cache', metavar="DIR",
+                        help="Optional. Directory to cache generated documents between requests")
+    parser.add_argument('-v', '--verbose', action="store_true", help="Optional. Log every request")
+    return parser
+
+
+def serve(argv) -> int:
+    from .server import DEFAULT_STYLE, ConversionService, make_server
+
+    args = build_serve_parser().parse_args(argv)
+    styles = {}
+    for item in args.style:
+        style_id, sep, path = item.partition("=")
+        if not sep:
+            style_id, path = DEFAULT_STYLE, item
+        styles[style_id] = path
+    if DEFAULT_STYLE not in styles and default_style():
+        styles[DEFAULT_STYLE] = default_style()
+
+    service = ConversionService(styles, workers=args.jobs, max_queue=args.max_queue,
+                                options={"image_cache": args.image_cache, "result_cache": args.result_cache},
+                                image_root=args.image_root)
+    server = make_server(service, args.host, args.port, socket_path=args.socket, max_body=args.max_body,
+                         verbose=args.verbose)
+    print("[SERVE] Listening on", args.socket or "http://%s:%d" % server.server_address[:2],
+          "| styles:", ", ".join(sorted(service.styles)), "| workers:", service.workers)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+def build_bench_parser() -> argparse.ArgumentParser:
+    from .bench import SCENARIOS
+
+    parser = argparse.ArgumentParser(prog="markdocx bench",
+                                     description="Convert synthetic large documents and report time and peak "
+                                                 "memory of each stage (parse, render, save)")
+    parser.add_argument('scenario', nargs='*', metavar="SCENARIO",
+                        help="Optional. Scenarios to run: %s (default: all)" % ", ".join(SCENARIOS))
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help="Optional. Multiplier for the default size of every scenario (default: 1.0)")
+    parser.add_argument('-n', '--rounds', type=int, default=3,
+                        help="Optional. Rounds per scenario, the fastest is reported (default: 3)")
+    parser.add_argument('-s', '--style', help="Optional. Style (YAML or .mdxs) used for the conversions")
+    parser.add_argument('--json', action="store_true", help="Optional. Print the results as JSON")
+    return parser
+
 
-    DocxProcessor(style_conf=conf) \
-        .html2docx(args.input + ".html", docx_path)
+def bench(argv) -> int:
+    from .bench import SCENARIOS, format_header, format_row, run_bench, to_json
+
+    parser = build_bench_parser()
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.scenario if name not in SCENARIOS]
+    if unknown:
+        parser.error("unknown scenario: %s" % ", ".join(unknown))
+    if not args.json:
+        print(format_header())
+    report = None if args.json else lambda result: print(format_row(result), flush=True)
+    results = run_bench(args.scenario, scale=args.scale, rounds=args.rounds,
+                        style_config=args.style or default_style(), report=report)
+    if args.json:
+        print(to_json(results))
+    return 0
+
+
+# markdocx <command> ...，其余参数均按转换处理
+COMMANDS = {
+    "compile-style": compile_style,
+    "serve": serve,
+    "bench": bench,
+}
+
+
+def write_profile(target: str, data):
+    """--profile：输出到文件，或为 - 时输出到标准输出"""
+    import json
+
+    text = json.dumps(data, indent=2, default=str)
+    if target == "-":
+        print(text)
+    else:
+        with open(target, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+
+
+def convert_single(args) -> int:
+    from . import MarkDocx
+    from .stats import ConversionStats
+
+    docx_path = args.output if args.output is not None else args.input[0] + ".docx"
+    start_time = time.time()  # 记录转换耗时
+    converter = MarkDocx(style_config=args.style, image_cache=args.image_cache, streaming=args.stream,
+                         result_cache=args.result_cache)
+    stats = ConversionStats()
+    converter.convert(args.input[0], docx_path, stats=stats)
     done_time = time.time()
 
-    print("[SUCCESS] Convert finished in:", "%.4f" % (done_time - start_time), "sec(s).")
-    print("[SUCCESS] Docx saved to:", os.path.abspath(docx_path))
+    if args.profile:
+        write_profile(args.profile, dict(input=args.input[0], output=os.path.abspath(docx_path),
+                                         **stats.to_dict()))
+    if args.profile != "-":
+        print("[SUCCESS] Convert finished in:", "%.4f" % (done_time - start_time), "sec(s).")
+        print("[SUCCESS] Docx saved to:", os.path.abspath(docx_path))
 
     if args.a:
         os.startfile(os.path.abspath(docx_path))
+    return 0
+
+
+def convert_batch(args) -> int:
+    from .batch import convert_many
+    from .diagnostics import silenced
+
+    start_time = time.time()
+    succeeded = failed = 0
+    quiet = args.profile == "-"
+    profile = []
+    options = {"image_cache": args.image_cache, "streaming": args.stream, "result_cache": args.result_cache}
+    try:
+        results = convert_many(args.input, args.output, style_config=args.style, workers=args.jobs,
+                               options=options)
+    except ValueError as e:  # 多个输入对应同一个输出文件
+        print("[FAILED]", e)
+        return 1
+    with silenced():  # 各文件的警告随结果逐个输出，不与进度信息交错
+        for result in results:
+            profile.append(dict(input=str(result.input), output=str(result.output) if result.ok else None,
+                                error=result.error, **(result.stats or {})))
+            if result.ok:
+                succeeded += 1
+                if not quiet:
+                    print("[SUCCESS]", result.input, "->", result.output, "(%.3f sec)" % result.seconds)
+            else:
+                failed += 1
+                if not quiet:
+                    print("[FAILED]", result.input, "|", result.error)
+            if not quiet:
+                for message in result.diagnostics:
+                    print("[WARNING]", result.input, "|", message)
+    done_time = time.time()
+
+    if args.profile:
+        write_profile(args.profile, profile)
+    if not quiet:
+        print("[DONE] %d converted, %d failed in %.4f sec(s)." % (succeeded, failed, done_time - start_time))
+    return 1 if failed else 0
+
+
+def configure_logging(verbose: int = 0):
+    """命令行的日志输出到标准错误，默认只输出警告"""
+    logging.basicConfig(format="[%(levelname)s] %(message)s", stream=sys.stderr)
+    level = logging.WARNING if verbose <= 0 else logging.INFO if verbose == 1 else logging.DEBUG
+    logging.getLogger(__package__).setLevel(level)
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv:
+        argv.append("-h")
+    if argv[0] in COMMANDS and not os.path.isfile(argv[0]):
+        configure_logging()
+        return COMMANDS[argv[0]](argv[1:])
+
+    args = build_parser().parse_args(argv)
+    configure_logging(args.verbose)
+    if not args.style:
+        args.style = default_style()
+
+    if len(args.input) == 1 and os.path.isfile(args.input[0]):
+        return convert_single(args)
+    return convert_batch(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,276 @@
+"""
+MarkDocx 转换器
+"""
+
+import io
+import os
+from pathlib import Path
+
+from .diagnostics import collect
+from .parser.md_parser import md2tree
+from .provider.doc_template import DocxTemplate
+from .provider.docx_processor import DocxProcessor
+from .provider.image_cache import ImageCache
+from .provider.image_fetcher import ImageFetcher, remote_src
+from .provider.image_optimizer import ImageOptimizer
+from .provider.result_cache import DirectoryResultCache, ResultCache, result_key
+from .provider.style_cache import resolve_style
+from .stats import ConversionStats
+
+
+class MarkDocx:
+    def __init__(self, style_config=None, image_workers=8, image_cache=None, streaming=False, executor=None,
+                 result_cache=None, on_stats=None):
+        """
+        初始化MarkDocx转换器
+        
+        Args:
+            style_config: 样式配置，可以是YAML文件路径、预编译样式（.mdxs）路径、字典或 CompiledStyle
+            image_workers: 并发下载网络图片的线程数
+            image_cache: 网络图片的磁盘缓存，可以是 ImageCache 或缓存目录
+            streaming: 输出到文件或流时，边渲染边写出 document.xml，适合超大文档
+            executor: aconvert 中执行解析和渲染的线程池，默认使用事件循环的默认 executor
+            result_cache: 整篇文档的转换结果缓存，可以是 MemoryResultCache、DirectoryResultCache 或缓存目录，
+                内容、样式、本地图片和版本都相同的转换直接返回上次的结果
+            on_stats: 每次转换完成后以该次的 ConversionStats 调用，可用于上报各阶段耗时
+
+        同一个转换器可以在多个线程中同时使用。每次转换的统计通过各转换方法的 stats 参数或 on_stats 取得，
+        不保存在转换器上。
+        """
+        # 样式配置只解析、编译一次（进程内缓存），每次转换从模板复制出新的文档
+        compiled = resolve_style(style_config)
+        self.style_config = compiled.style_conf
+        self.template = DocxTemplate(compiled=compiled)
+        # 网络图片下载器在多次转换间共用，复用 HTTP 连接
+        if image_cache is not None and not isinstance(image_cache, ImageCache):
+            image_cache = ImageCache(image_cache)
+        self.fetcher = ImageFetcher(max_workers=image_workers, cache=image_cache)
+        # 图片优化的结果缓存在多次转换间共用
+        self.optimizer = ImageOptimizer.from_conf(self.style_config.get("image"))
+        if result_cache is not None and not isinstance(result_cache, ResultCache):
+            result_cache = DirectoryResultCache(result_cache)
+        self.result_cache = result_cache
+        self.streaming = streaming
+        self.executor = executor
+        self.on_stats = on_stats
+        # 批量转换时，工作进程用相同的参数创建转换器
+        self.options = {"image_workers": image_workers, "image_cache": image_cache, "streaming": streaming,
+                        "result_cache": result_cache}
+    
+    def convert(self, input_path, output_path=None, auto_open=False, stats: ConversionStats = None):
+        """
+        转换Markdown文件到Word文档
+        
+        Args:
+            input_path: Markdown文件路径
+            output_path: 输出Word文件路径，默认为输入文件同目录
+            auto_open: 是否自动打开生成的文件
+            stats: 记入本次转换统计的 ConversionStats（传入新建的对象，转换后读取）
+            
+        Returns:
+            输出文件路径
+        """
+        input_path = Path(input_path)
+        if not input_path.exists():
+            raise FileNotFoundError(f"Input file not found: {input_path}")
+        
+        if output_path is None:
+            output_path = input_path.with_suffix('.docx')
+        else:
+            output_path = Path(output_path)
+        
+        # 转换过程，不产生中间文件
+        stats = ConversionStats() if stats is None else stats
+        with collect(stats.diagnostics):
+            with stats.stage("read"):
+                markdown_string = input_path.read_text(encoding='utf-8')
+            if self.result_cache is not None:
+                self._convert_cached(markdown_string, base_dir=input_path.parent, target=str(output_path),
+                                     stats=stats)
+            else:
+                processor = self._render(markdown_string, base_dir=input_path.parent,
+                                         stream_to=str(output_path) if self.streaming else None, stats=stats)
+                processor.save(str(output_path))
+        self._finish(stats)
+        if auto_open and output_path.exists():
+            os.startfile(str(output_path.absolute()))
+        return output_path
+    
+    def convert_string(self, markdown_string, output_path=None, base_dir=None, stats: ConversionStats = None):
+        """
+        转换Markdown字符串到Word文档
+        
+        Args:
+            markdown_string: Markdown内容
+            output_path: 输出Word文件路径或可写的二进制流，为空时直接返回 bytes
+            base_dir: 相对路径图片所在的目录，默认为当前工作目录
+            stats: 记入本次转换统计的 ConversionStats，同 convert
+            
+        Returns:
+            输出文件路径，未指定 output_path 时返回 .docx 的 bytes
+        """
+        if isinstance(output_path, (str, Path)):
+            output_path = Path(output_path)
+            target = str(output_path)
+        else:
+            target = output_path
+        stats = ConversionStats() if stats is None else stats
+        with collect(stats.diagnostics):
+            if self.result_cache is not None:
+                data = self._convert_cached(markdown_string, base_dir=base_dir, target=target, stats=stats)
+            elif target is None:
+                data = self._render(markdown_string, base_dir=base_dir, stats=stats).to_bytes()
+            else:
+                processor = self._render(markdown_string, base_dir=base_dir,
+                                         stream_to=target if self.streaming else None, stats=stats)
+                processor.save(target)
+        self._finish(stats)
+        return data if output_path is None else output_path
+
+    def to_bytes(self, source, base_dir=None) -> bytes:
+        """
+        转换Markdown内容并以 bytes 返回，不读写任何中间文件
+        
+        Args:
+            source: Markdown字符串，或可读的文本/二进制流
+            base_dir: 相对路径图片所在的目录，默认为当前工作目录
+        """
+        if not isinstance(source, str):
+            source = source.read()
+            if isinstance(source, bytes):
+                source = source.decode('utf-8')
+        return self.convert_string(source, base_dir=base_dir)
+
+    def to_stream(self, source, base_dir=None) -> io.BytesIO:
+        """与 to_bytes 相同，但返回定位到开头的 BytesIO"""
+        return io.BytesIO(self.to_bytes(source, base_dir=base_dir))
+
+    def convert_many(self, inputs, out_dir=None, workers=None):
+        """
+        用进程池批量转换，按完成顺序逐个返回 BatchResult
+
+        Args:
+            inputs: Markdown 文件、目录或 glob 通配符的列表
+            out_dir: 输出目录，默认输出到各输入文件旁边
+            workers: 进程数，默认为 CPU 核数
+            
+        Returns:
+            BatchResult 的迭代器，单个文件失败不会中断批次
+        """
+        from .batch import convert_many
+        # 工作进程直接使用编译好的样式
+        return convert_many(inputs, out_dir, style_config=self.template.compiled,
+                            workers=workers, converter=self, options=self.options)
+
+    async def aconvert(self, markdown_string, base_dir=None, executor=None, stats: ConversionStats = None) -> bytes:
+        """
+        asyncio 版本的转换，返回 .docx 的 bytes
+
+        Markdown 解析和渲染是 CPU 密集的工作，在 executor 中执行，不阻塞事件循环；
+        网络图片在事件循环中并发下载（需要 aiohttp，未安装时退回到线程池中用 requests 下载）。
+        executor 需是线程池：渲染中的文档对象不能跨进程传递。
+
+        Args:
+            markdown_string: Markdown 内容，str 或 UTF-8 编码的 bytes
+            base_dir: 相对路径图片所在的目录，默认为当前工作目录
+            executor: 执行解析和渲染的线程池，默认为构造时指定的 executor
+            stats: 记入本次转换统计的 ConversionStats，同 convert
+        """
+        if isinstance(markdown_string, bytes):
+            markdown_string = markdown_string.decode('utf-8')
+        import asyncio  # 只有异步调用者需要，不增加同步转换的导入耗时
+        loop = asyncio.get_running_loop()
+        executor = executor or self.executor
+        base_dir = str(base_dir) if base_dir else None
+        stats = ConversionStats() if stats is None else stats
+        stats.markdown_bytes = len(markdown_string.encode('utf-8'))
+
+        with stats.stage("parse"):
+            body = await loop.run_in_executor(executor, md2tree, markdown_string)
+        key = None
+        if self.result_cache is not None:
+            with stats.stage("cache"):
+                key, data = await loop.run_in_executor(executor, self._cache_lookup, markdown_string, body, base_dir)
+            if data is not None:
+                stats.cache_hit = True
+                stats.bytes_written = len(data)
+                self._finish(stats)
+                return data
+        urls = [url for url in map(remote_src, body.find_all("img")) if url]
+        with stats.stage("images"), collect(stats.diagnostics):
+            images = await self.fetcher.aprefetch(urls)
+        stats.remote_images += len(urls)
+
+        def render() -> bytes:
+            # 线程池中的线程不继承调用者的上下文，诊断信息显式记入同一个列表
+            with collect(stats.diagnostics):
+                # 从模板复制文档也在线程池中进行，不占用事件循环
+                processor = self._new_processor(stats=stats)
+                processor.images.update(images)
+                data = processor.render_tree(body, base_dir=base_dir).to_bytes()
+            if key is not None:
+                self._cache_put(key, data, stats)
+            return data
+
+        data = await loop.run_in_executor(executor, render)
+        self._finish(stats)
+        return data
+
+    def _new_processor(self, stream_to=None, stats: ConversionStats = None) -> DocxProcessor:
+        processor = DocxProcessor(template=self.template, fetcher=self.fetcher, optimizer=self.optimizer, stats=stats)
+        if stream_to is not None:
+            processor.stream_to(stream_to)
+        return processor
+
+    def _cache_lookup(self, markdown_string, body, base_dir=None):
+        key = result_key(markdown_string, self.template.compiled, body, base_dir)
+        return key, self.result_cache.get(key)
+
+    def _cache_put(self, key, data, stats: ConversionStats):
+        """转换产生了警告（如网络图片下载失败）时不存入缓存，否则之后每次命中都返回缺少内容的结果"""
+        if not stats.diagnostics:
+            self.result_cache.put(key, data)
+
+    def _convert_cached(self, markdown_string, base_dir=None, target=None, stats: ConversionStats = None) -> bytes:
+        """启用结果缓存时的转换：命中时直接写出缓存的 bytes，未命中时渲染并存入缓存"""
+        stats = stats or ConversionStats()
+        stats.markdown_bytes = len(markdown_string.encode('utf-8'))
+        base_dir = str(base_dir) if base_dir else None
+        with stats.stage("parse"):
+            body = md2tree(markdown_string)
+        with stats.stage("cache"):
+            key, data = self._cache_lookup(markdown_string, body, base_dir)
+        if data is None:
+            stream_to = target if self.streaming and isinstance(target, str) else None
+            processor = self._new_processor(stream_to, stats).render_tree(body, base_dir=base_dir)
+            if stream_to is not None:
+                # 流式渲染仍只占用单个块的内存，写出后再读回文件存入缓存
+                processor.save(target)
+                data = Path(target).read_bytes()
+                self._cache_put(key, data, stats)
+                return data
+            data = processor.to_bytes()
+            self._cache_put(key, data, stats)
+            if target is None:
+                return data
+        else:
+            stats.cache_hit = True
+        with stats.stage("save"):
+            if isinstance(target, str):
+                Path(target).write_bytes(data)
+            elif target is not None:
+                target.write(data)
+        stats.bytes_written = len(data)
+        return data
+
+    def _render(self, markdown_string, base_dir=None, stream_to=None, stats: ConversionStats = None) -> DocxProcessor:
+        stats = stats or ConversionStats()
+        stats.markdown_bytes = len(markdown_string.encode('utf-8'))
+        with stats.stage("parse"):
+            body = md2tree(markdown_string)
+        processor = self._new_processor(stream_to, stats)
+        return processor.render_tree(body, base_dir=str(base_dir) if base_dir else None)
+
+    def _finish(self, stats: ConversionStats):
+        if self.on_stats is not None:
+            self.on_stats(stats)
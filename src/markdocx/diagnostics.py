@@ -0,0 +1,62 @@
+"""
+转换过程中的诊断信息
+
+markdocx 的各模块通过 logging.getLogger(__name__) 输出日志（包的根 logger 只挂了 NullHandler，
+由使用者或命令行决定输出到哪里）。转换一篇文档时，WARNING 及以上的日志同时记入该文档的诊断列表，
+保存在 ConversionStats.diagnostics 和 BatchResult.diagnostics 中。
+批量转换的工作进程不再输出这些日志，由主进程按文件逐个报告，不会在多个进程间交错。
+"""
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current: ContextVar = ContextVar("markdocx_diagnostics", default=None)
+
+
+class DiagnosticsHandler(logging.Handler):
+    """把 WARNING 及以上的日志记入当前正在转换的文档的诊断列表"""
+
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.setFormatter(logging.Formatter("%(levelname)s: %(message)s"))
+
+    def emit(self, record: logging.LogRecord):
+        diagnostics = _current.get()
+        if diagnostics is not None:
+            diagnostics.append(self.format(record))
+
+
+@contextmanager
+def collect(diagnostics: list = None):
+    """
+    在 with 块中收集诊断信息
+
+    Args:
+        diagnostics: 追加到的列表，默认新建；在线程池中继续同一次转换时传入同一个列表
+    """
+    diagnostics = [] if diagnostics is None else diagnostics
+    token = _current.set(diagnostics)
+    try:
+        yield diagnostics
+    finally:
+        _current.reset(token)
+
+
+def silence():
+    """只收集诊断信息、不再向上传递给根 logger，用于批量转换的工作进程"""
+    logging.getLogger(__package__).propagate = False
+
+
+@contextmanager
+def silenced():
+    """在 with 块中临时 silence，结束后恢复"""
+    logger = logging.getLogger(__package__)
+    propagate, logger.propagate = logger.propagate, False
+    try:
+        yield
+    finally:
+        logger.propagate = propagate
+
+
+_handler = DiagnosticsHandler()
+logging.getLogger(__package__).addHandler(_handler)
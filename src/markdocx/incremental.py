@@ -0,0 +1,163 @@
+"""
+增量转换：只重新渲染修改过的顶层块
+
+长文档每次只改动一小部分时，按 render_tree 遍历 body 子标签的粒度把文档切分成顶层块，
+以块的内容计算哈希，缓存每个块渲染出的 w:p / w:tbl 等元素。再次转换时只渲染哈希变化的块，
+其余块直接复制缓存的元素，并把其中引用的图片、超链接关系重新登记到新文档中。
+"""
+import copy
+import hashlib
+import os
+import xml.etree.ElementTree as ElementTree
+from pathlib import Path
+
+from docx.oxml.ns import qn
+
+from .parser.md_parser import md2tree
+from .provider.image_fetcher import is_remote, remote_src
+
+# 元素中引用关系 id 的属性：超链接的 r:id，图片的 r:embed / r:link
+_REL_ATTRS = (qn("r:id"), qn("r:embed"), qn("r:link"))
+_DOC_PR = qn("wp:docPr")
+
+
+class _Fragment:
+    """一个顶层块渲染出的 body 元素，以及其中引用的关系和样式调整"""
+    __slots__ = ("elements", "relations", "style_tweaks")
+
+    def __init__(self, elements: list, relations: dict, style_tweaks: tuple = ()):
+        self.elements = elements  # 脱离文档的元素副本
+        self.relations = relations  # {原 rId: (关系类型, 外部地址或图片 bytes, 是否外部关系, 图片的原文件名)}
+        self.style_tweaks = style_tweaks  # 渲染时请求过的 DocxProcessor.tweak_style 名称
+
+    @classmethod
+    def capture(cls, part, elements, style_tweaks=()):
+        """复制刚渲染出的元素，记下其中引用的关系"""
+        elements = [copy.deepcopy(element) for element in elements]
+        relations = {}
+        for element in elements:
+            for node in element.iter():
+                for attr in _REL_ATTRS:
+                    rId = node.get(attr)
+                    if rId is None or rId in relations:
+                        continue
+                    rel = part.rels[rId]
+                    if rel.is_external:
+                        relations[rId] = (rel.reltype, rel.target_ref, True, None)
+                    else:  # 文档中引用的内部 part 只有图片，记下文件名，重新登记后之后的图形仍使用原文件名
+                        image_part = rel.target_part
+                        relations[rId] = (rel.reltype, image_part.blob, False, image_part.filename)
+        return cls(elements, relations, tuple(style_tweaks))
+
+    def splice(self, processor, anchor):
+        """把缓存的元素插入到 anchor 之前，关系 id 和图形 id 按新文档重新分配"""
+        for name in self.style_tweaks:
+            processor.tweak_style(name)
+        part = processor.document.part
+        mapping = {}
+        for rId, (reltype, target, is_external, filename) in self.relations.items():
+            if is_external:
+                mapping[rId] = part.relate_to(target, reltype, is_external=True)
+            else:
+                mapping[rId] = processor.image_registry.get_or_add_image(target, filename)[0]
+
+        for element in self.elements:
+            element = copy.deepcopy(element)
+            for node in element.iter():
+                for attr in _REL_ATTRS:
+                    rId = node.get(attr)
+                    if rId is not None:
+                        node.set(attr, mapping[rId])
+                if node.tag == _DOC_PR:
+                    node.set("id", str(processor.image_registry.next_id()))
+            anchor.addprevious(element)
+
+
+class IncrementalConverter:
+    """
+    增量转换器，适合反复转换同一份不断修改的长文档
+
+    只保留最近一次转换用到的块，内存占用与单个文档相当。
+    块的哈希包含其 Markdown 解析结果、图片目录和引用的本地图片的修改时间；
+    网络图片与 ImageFetcher 的缓存一致，地址不变时沿用上次下载的内容。
+    """
+
+    def __init__(self, converter=None):
+        """
+        Args:
+            converter: 提供样式、图片下载器等的 MarkDocx 实例，默认使用内置样式新建
+        """
+        if converter is None:
+            from .converter import MarkDocx
+            converter = MarkDocx()
+        self.converter = converter
+        self._fragments = {}  # 块的哈希 -> _Fragment
+        self.rendered = 0  # 最近一次转换中重新渲染的块数
+        self.reused = 0  # 最近一次转换中直接复用的块数
+
+    def convert(self, input_path, output_path=None):
+        """转换 Markdown 文件，返回输出文件路径"""
+        input_path = Path(input_path)
+        output_path = Path(output_path) if output_path is not None else input_path.with_suffix('.docx')
+        markdown_string = input_path.read_text(encoding='utf-8')
+        self._build(markdown_string, input_path.parent).save(str(output_path))
+        return output_path
+
+    def convert_string(self, markdown_string: str, output_path=None, base_dir=None):
+        """转换 Markdown 字符串，未指定 output_path 时返回 .docx 的 bytes"""
+        processor = self._build(markdown_string, base_dir)
+        if output_path is None:
+            return processor.to_bytes()
+        if isinstance(output_path, (str, Path)):
+            output_path = Path(output_path)
+            processor.save(str(output_path))
+        else:
+            processor.save(output_path)
+        return output_path
+
+    def _build(self, markdown_string: str, base_dir=None):
+        base_dir = str(base_dir) if base_dir else None
+        body = md2tree(markdown_string)
+        processor = self.converter._new_processor()
+        processor.base_dir = base_dir
+
+        blocks = [(block, self._block_key(block, processor)) for block in body.children if block.name is not None]
+        # 只下载需要重新渲染的块中的网络图片
+        urls = [url for block, key in blocks if key not in self._fragments
+                for url in map(remote_src, block.find_all("img")) if url]
+        processor.images.update(processor.fetcher.prefetch(urls))
+
+        body_element = processor.document.element.body
+        anchor = body_element.sectPr  # 新内容总是插在 sectPr 之前
+        fragments = {}
+        self.rendered = self.reused = 0
+        for block, key in blocks:
+            fragment = fragments.get(key) or self._fragments.get(key)
+            if fragment is not None:
+                fragment.splice(processor, anchor)
+                self.reused += 1
+            else:
+                start = len(body_element) - 1
+                tweaks = dict(processor.style_tweaks)
+                processor.render_block(block)
+                tweaked = [name for name, count in processor.style_tweaks.items() if count > tweaks.get(name, 0)]
+                fragment = _Fragment.capture(processor.document.part, body_element[start:-1], tweaked)
+                self.rendered += 1
+            fragments[key] = fragment
+        self._fragments = fragments
+        return processor
+
+    @staticmethod
+    def _block_key(block, processor) -> str:
+        digest = hashlib.sha1(ElementTree.tostring(block.element))
+        digest.update((processor.base_dir or "").encode("utf-8"))
+        # Markdown 不变时本地图片也可能被替换
+        for img in block.find_all("img"):
+            src = img.get("src", "")
+            if src and not is_remote(src):
+                try:
+                    stat = os.stat(processor.resolve_path(src))
+                    digest.update(("%s:%d:%d" % (src, stat.st_mtime_ns, stat.st_size)).encode("utf-8"))
+                except OSError:
+                    digest.update(src.encode("utf-8"))
+        return digest.hexdigest()
@@ -1,19 +1,156 @@
+import html
+import re
+import threading
+import xml.etree.ElementTree as etree
+from html.parser import HTMLParser
+
 import markdown
+from markdown import util
 
 from ..parser.ext_md_syntax import ExtMdSyntax
+from ..parser.tree_node import TreeNode
+
+# 与 Python-Markdown 序列化时的规则一致：已经是实体的 & 不再转义
+_RE_AMP = re.compile(r'&(?!(?:#[0-9]+|#x[0-9a-f]+|[0-9a-z]+);)', re.I)
+# 不需要闭合的 HTML 标签
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input",
+              "link", "meta", "param", "source", "track", "wbr"}
+
+_local = threading.local()
+
+
+def _new_markdown() -> markdown.Markdown:
+    return markdown.Markdown(extensions=[ExtMdSyntax(), 'tables', 'sane_lists', 'fenced_code'])
+
+
+def md2html_str(text: str) -> str:
+    """将 Markdown 文本转换为 HTML 字符串，全程在内存中完成"""
+    html_str = _new_markdown().convert(text)
+    return """<head><meta charset="utf-8"></head>\n<body>\n""" + html_str + "</body>"
 
 
 def md2html(in_path: str, out_path: str):
     with open(in_path, "r", encoding="utf-8") as input_file:
         text = input_file.read()
 
-    html = markdown.markdown(text, extensions=[ExtMdSyntax(), 'tables', 'sane_lists', 'fenced_code'])
-
     with open(out_path, 'w', encoding="UTF-8") as html_file:
-        html_file.write("""<head><meta charset="utf-8"></head>\n<body>\n""")
-        html_file.write(html)
-        html_file.write("</body>")
+        html_file.write(md2html_str(text))
+
+
+def md2tree(text: str) -> TreeNode:
+    """
+    将 Markdown 文本解析为元素树，直接交给 DocxProcessor.render_tree 渲染
+
+    与 md2html_str 相比，省去了 HTML 的序列化和 BeautifulSoup 的再次解析：
+    只运行 Python-Markdown 的 preprocessors、块解析和 treeprocessors，
+    然后取其内部的 ElementTree。
+    """
+    md = getattr(_local, "md", None)
+    if md is None:
+        md = _local.md = _new_markdown()
+    md.reset()
+
+    root = etree.Element("div")
+    if text.strip():
+        lines = text.split("\n")
+        for prep in md.preprocessors:
+            lines = prep.run(lines)
+        root = md.parser.parseDocument(lines).getroot()
+        for treeprocessor in md.treeprocessors:
+            new_root = treeprocessor.run(root)
+            if new_root is not None:
+                root = new_root
+        _restore_tree(md, root)
+        if len(root) and root[-1].tail and not root[-1].tail.strip():
+            root[-1].tail = None
+    return TreeNode(root)
+
+
+def _restore_tree(md: markdown.Markdown, root):
+    """
+    还原树中仍保持 Python-Markdown 内部表示的部分，使结果与 HTML 再解析后的结果一致：
+    - 行内代码等处被预先转义的字符；
+    - 暂存在 htmlStash 中的原始 HTML（如 fenced code、<u>、<img>），
+      只对包含占位符的顶层块走一遍序列化和 postprocessors，再解析回元素树。
+    """
+    for index, block in reversed(list(enumerate(root))):
+        if any(util.STX in (elem.text or "") or util.STX in (elem.tail or "")
+               for elem in block.iter()):
+            _replace_block(md, root, index, block)
+            continue
+        for elem in block.iter():
+            if elem.text and "&" in elem.text:
+                elem.text = _unescape(elem.text)
+            if elem is not block and elem.tail and "&" in elem.tail:
+                elem.tail = _unescape(elem.tail)
+
+
+def _unescape(text: str) -> str:
+    return html.unescape(_RE_AMP.sub("&amp;", text))
+
+
+def _replace_block(md: markdown.Markdown, root, index: int, block):
+    tail, block.tail = block.tail, None
+    html_str = md.serializer(block)
+    for pp in md.postprocessors:
+        html_str = pp.run(html_str)
+
+    builder = _TreeBuilder()
+    builder.feed(html_str)
+    builder.close()
+    fragment = builder.root
+
+    root.remove(block)
+    if fragment.text:
+        _append_text(root, index, fragment.text)
+    for offset, elem in enumerate(fragment):
+        root.insert(index + offset, elem)
+    if len(fragment):
+        last = root[index + len(fragment) - 1]
+        # 片段末尾的空白换行与原有的 tail 重复，只保留原有的
+        last.tail = tail if not (last.tail or "").strip() else last.tail + (tail or "")
+    elif tail:
+        _append_text(root, index, tail)
+
+
+def _append_text(root, index: int, text: str):
+    if index > 0:
+        root[index - 1].tail = (root[index - 1].tail or "") + text
+    else:
+        root.text = (root.text or "") + text
+
+
+class _TreeBuilder(HTMLParser):
+    """用标准库的 html.parser 把 HTML 片段构造成 ElementTree，行为与 bs4 的 html.parser 相同"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = etree.Element("div")
+        self._stack = [self.root]
+        self._last = None  # 上一个已闭合的元素，其后的文本应写入 tail
+
+    def handle_starttag(self, tag, attrs):
+        elem = etree.SubElement(self._stack[-1], tag, {k: v or "" for k, v in attrs})
+        self._last = None
+        if tag in _VOID_TAGS:
+            self._last = elem
+        else:
+            self._stack.append(elem)
+
+    def handle_startendtag(self, tag, attrs):
+        elem = etree.SubElement(self._stack[-1], tag, {k: v or "" for k, v in attrs})
+        self._last = elem
 
+    def handle_endtag(self, tag):
+        for i in range(len(self._stack) - 1, 0, -1):
+            if self._stack[i].tag == tag:
+                self._last = self._stack[i]
+                del self._stack[i:]
+                return
 
-if __name__ == '__main__':
-    md2html("example.md", "example.html")
+    def handle_data(self, data):
+        if self._last is not None:
+            self._last.tail = (self._last.tail or "") + data
+        else:
+            parent = self._stack[-1]
+            parent.text = (parent.text or "") + data
@@ -0,0 +1,89 @@
+class TextNode(str):
+    """
+    文本节点，对应 bs4 中的 NavigableString
+    """
+    name = None
+
+    @property
+    def string(self):
+        return self
+
+
+class TreeNode:
+    """
+    以 bs4 Tag 的接口包装 ElementTree 元素
+
+    DocxProcessor 只用到 Tag 接口中很小的一部分（name、string、contents、children、
+    get、get_text、下标取属性、以属性形式查找子标签），这里一一对应地实现，
+    使同一套渲染代码既能处理 BeautifulSoup 的结果，也能直接处理 Python-Markdown 的元素树。
+    """
+    __slots__ = ("element", "_contents")
+
+    def __init__(self, element):
+        self.element = element
+        self._contents = None
+
+    @property
+    def name(self) -> str:
+        return self.element.tag
+
+    @property
+    def contents(self) -> list:
+        if self._contents is None:
+            contents = []
+            elem = self.element
+            if elem.text:
+                contents.append(TextNode(elem.text))
+            for child in elem:
+                contents.append(TreeNode(child))
+                if child.tail:
+                    contents.append(TextNode(child.tail))
+            self._contents = contents
+        return self._contents
+
+    @property
+    def children(self):
+        return iter(self.contents)
+
+    def __iter__(self):
+        return iter(self.contents)
+
+    @property
+    def string(self):
+        # 与 bs4 一致：只有唯一子节点时才有 string，并向下递归
+        contents = self.contents
+        if len(contents) != 1:
+            return None
+        return contents[0].string
+
+    def get_text(self) -> str:
+        return "".join(self.element.itertext())
+
+    def get(self, key: str, default=None):
+        value = self.element.get(key)
+        if value is None:
+            return default
+        if key == "class":
+            return value.split()
+        return value
+
+    def __getitem__(self, key: str):
+        return self.element.attrib[key]
+
+    def find(self, name: str):
+        for elem in self.element.iter(name):
+            if elem is not self.element:
+                return TreeNode(elem)
+        return None
+
+    def find_all(self, name: str) -> list:
+        return [TreeNode(elem) for elem in self.element.iter(name) if elem is not self.element]
+
+    def __getattr__(self, name: str):
+        # tag.ol、tag.thead 等写法，等价于 find
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self.find(name)
+
+    def __repr__(self) -> str:
+        return "<TreeNode %s>" % self.element.tag
@@ -0,0 +1,25 @@
+from docx import Document
+
+from ..provider.style_cache import CompiledStyle, compile_style
+
+
+class DocxTemplate:
+    """
+    已经初始化好样式的空白文档
+
+    样式只编译一次（结果在进程内缓存，见 style_cache），之后每次转换都从已注入样式的空白文档深拷贝出一份新的文档，
+    既不用重复设置样式，也不会让多次转换的内容累积在同一个文档里。
+    """
+
+    def __init__(self, style_conf: dict = None, compiled: CompiledStyle = None):
+        """
+        Args:
+            style_conf: 样式配置
+            compiled: 已编译的样式，指定时忽略 style_conf
+        """
+        self.compiled = compiled or compile_style(style_conf)
+        self.style_conf = self.compiled.style_conf
+
+    def new_document(self) -> Document:
+        """复制出一份新的文档，对其修改不会影响模板"""
+        return self.compiled.new_document()
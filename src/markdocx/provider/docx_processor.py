@@ -1,12 +1,12 @@
 # noinspection PyProtectedMember
 #
+import copy
 import io
+import logging
 import os
 import re
 import docx
-from urllib.request import urlopen
 
-from bs4 import BeautifulSoup
 from docx import Document
 from docx.enum.table import WD_TABLE_ALIGNMENT
 from docx.enum.text import *
@@ -19,59 +19,140 @@ from docx.table import Table
 from docx.text.paragraph import Paragraph
 from docx.text.run import Run
 from docx.opc.constants import RELATIONSHIP_TYPE
-from requests import HTTPError
 
+from ..provider.doc_template import DocxTemplate
 from ..provider.docx_plus import add_hyperlink
-from ..provider.style_manager import StyleManager
+from ..provider.format_templates import ParagraphTemplates
+from ..provider.image_fetcher import ImageFetcher, remote_src
+from ..provider.image_optimizer import ImageOptimizer
+from ..provider.image_registry import ImageRegistry
+from ..provider.run_builder import PLAIN, RunBuilder, rpr_template, walk_inline
+from ..provider.stream_writer import StreamingDocxWriter
+from ..provider.style_cache import compile_style
+from ..provider.table_builder import TableBuilder, TableLayout
+from ..stats import ConversionStats, timed
 from ..utils.style_enum import MDX_STYLE
 
-debug_state: bool = False
+logger = logging.getLogger(__name__)
+
 auto_open: bool = True
 show_image_desc: bool = True  # 是否显示图片的描述，即 `![desc](src/img)` 中 desc的内容
 
 
-def debug(*args):
-    print(*args) if debug_state else None
+def _space_after_1pt(style):
+    style.paragraph_format.space_after = Pt(1)
+
+
+def _no_first_line_indent(style):
+    style.paragraph_format.first_line_indent = 0
+
+
+def _caption_font(style):
+    style.font.color.rgb = RGBColor(11, 11, 11)
+    style.font.bold = False
+
+
+_CODE = frozenset(("code",))
+_HYPERLINK = frozenset(("hyperlink",))
+
+# 渲染列表、图片描述时对共用样式的调整 {名称: (样式名, 调整函数)}，每份文档只需执行一次
+STYLE_TWEAKS = {
+    "list-number": (MDX_STYLE.LIST_NUMBER, _space_after_1pt),  # TODO 数字列表样式
+    "list-continue-number": (MDX_STYLE.LIST_CONTINUE, _no_first_line_indent),
+    "list-bullet": (MDX_STYLE.LIST_BULLET, _space_after_1pt),  # TODO 无序列表样式 ·• ‣°º৹ ■ ◻ ■ □ ◉◎ ●◌
+    "list-continue-bullet": (MDX_STYLE.LIST_CONTINUE, _space_after_1pt),
+    "caption": (MDX_STYLE.CAPTION, _caption_font),  # TODO 图片描述的显示样式
+}
+
+
+def cell_text(cell) -> str:
+    """单元格的文本，含多个行内元素时拼接全部文字"""
+    text = cell.string
+    return text if text is not None else cell.get_text()
+
+
+def output_size(target) -> int:
+    """写出的 .docx 大小：文件按文件大小，流按写完后的位置计算（假定从开头写入）"""
+    if isinstance(target, (str, os.PathLike)):
+        return os.path.getsize(target)
+    return target.tell() if hasattr(target, "tell") else 0
 
 
 class DocxProcessor:
-    def __init__(self, style_conf: dict):
-        self.document = Document()
-        if style_conf is not None:
-            StyleManager(self.document, style_conf).init_styles()
+    def __init__(self, style_conf: dict = None, template: DocxTemplate = None, fetcher: ImageFetcher = None,
+                 optimizer: ImageOptimizer = None, stats: ConversionStats = None):
+        """
+        Args:
+            style_conf: 样式配置
+            template: 预先设置好样式的模板，指定时忽略 style_conf，直接从模板复制文档
+            fetcher: 网络图片下载器，可在多次转换间共用以复用连接
+            optimizer: 图片优化器，默认按 style_conf 中的 image 段创建，可在多次转换间共用以复用缓存
+            stats: 记录各阶段和各类元素耗时的 ConversionStats，为空时不统计
+        """
+        self.base_dir: str = None  # 相对路径图片所在的目录，每次转换单独指定，不修改进程的工作目录
+        self.fetcher = fetcher or ImageFetcher()
+        self.images: dict = {}  # 预先下载好的网络图片 {url: bytes 或异常}
+        if template is not None:
+            self.document = template.new_document()
+        else:
+            self.document = compile_style(style_conf).new_document()
+        conf = template.style_conf if template is not None else (style_conf or {})
+        # 超大表格的拆分方式，未配置时按原样生成一个表格
+        self.table_layout = TableLayout.from_conf(conf.get("table"))
+        if optimizer is None and style_conf:
+            optimizer = ImageOptimizer.from_conf(style_conf.get("image"))
+        # 同一张图片在文档中只嵌入、解析一次
+        self.image_registry = ImageRegistry(self.document.part, optimizer=optimizer)
+        self.writer: StreamingDocxWriter = None  # 流式输出时，每个顶层块渲染完即写出
+        self.style_tweaks: dict = {}  # 渲染中请求过的样式调整 {名称: 次数}
+        self.paragraphs = ParagraphTemplates(self.document)  # 按样式和段落格式复制 w:pPr 模板添加段落
+        self.stats = stats
+
+    def tweak_style(self, name: str):
+        """对文档的共用样式执行 STYLE_TWEAKS 中的调整，同一文档只在第一次请求时修改"""
+        count = self.style_tweaks.get(name, 0)
+        if not count:
+            style_name, tweak = STYLE_TWEAKS[name]
+            tweak(self.document.styles[style_name])
+        self.style_tweaks[name] = count + 1
+
+    def stream_to(self, target):
+        """
+        改为流式输出：之后 render_tree 每渲染完一个顶层块就写入 target 并释放，最后调用 save() 写出其余部分
+
+        Args:
+            target: 文件路径或可写的二进制流
+        """
+        self.writer = StreamingDocxWriter(self.document, target)
+        return self
+
+    def resolve_path(self, path: str) -> str:
+        """相对路径按本次转换的 base_dir 解析"""
+        if self.base_dir and not os.path.isabs(path):
+            return os.path.join(self.base_dir, path)
+        return path
+
+    def prefetch_images(self, body_tag):
+        """渲染前收集所有网络图片并并发下载，已经下载好的（如 aconvert 中异步下载的）不再重复下载"""
+        urls = [url for url in map(remote_src, body_tag.find_all("img")) if url and url not in self.images]
+        self.images.update(self.fetcher.prefetch(urls))
+        if self.stats is not None:
+            self.stats.remote_images += len(urls)
+
+    def remote_image(self, url: str):
+        """取预先下载好的网络图片，未预取时现场下载"""
+        if url not in self.images:
+            self.images.update(self.fetcher.prefetch([url]))
+        return self.images[url]
 
     # h1, h2, ...
+    @timed("heading")
     def add_heading(self, content: str, tag: str):
         level: int = int(tag.__getitem__(1))
-        p = self.document.add_paragraph(content, style="Heading%d" % level)
+        p = self.paragraphs.add_paragraph(content, style="Heading%d" % level)
         return p
 
-    # noinspection PyMethodMayBeStatic
-    def add_run(self, p: Paragraph, content: str, char_style: str = "plain"):
-        # fixme 行内的样式超过一个的句子会被忽略，如：
-        # <u>**又加粗又*斜体*又下划线**</u>
-        debug("[%s]:" % char_style, content)
-        run = p.add_run(content)
-
-        # 不应当使用形如 run.bold = (char_style=="strong") 的方式
-        # 因为没有显式加粗，不意味着整体段落不加粗。
-        if char_style == "strong":
-            run.bold = True
-        if char_style == "em":
-            run.italic = True
-        if char_style == "u":
-            run.underline = True
-        if char_style == "strike":
-            run.font.strike = True
-        if char_style == "sub":
-            run.font.subscript = True
-        if char_style == "sup":
-            run.font.superscript = True
-        run.font.highlight_color = WD_COLOR_INDEX.YELLOW if char_style == "highlight" else None
-
-        # if char_style == "code":
-        #     run.font.name = "Consolas"
-
+    @timed("code_block")
     def add_code_block(self, pre_tag):
         """处理代码块"""
         # 获取代码内容
@@ -84,21 +165,13 @@ class DocxProcessor:
         if code_content:
             # 去除多余的换行符
             code_content = code_content.strip()
-            # 创建代码块段落
-            p = self.document.add_paragraph(style=MDX_STYLE.PLAIN_TEXT)
-            run = p.add_run(code_content)
-            run.font.name = "Consolas"
-            # 设置代码块的格式
-            p.paragraph_format.first_line_indent = 0
-            p.paragraph_format.left_indent = Pt(20)  # 左缩进
-            p.paragraph_format.space_before = Pt(10)  # 段前间距
-            p.paragraph_format.space_after = Pt(10)  # 段后间距
+            # 创建代码块段落：无首行缩进、左缩进 20pt、段前段后 10pt，文本为 Consolas 字体
+            self.paragraphs.add_paragraph(code_content, style=MDX_STYLE.PLAIN_TEXT, fmt="code", formats=_CODE)
 
+    @timed("picture")
     def add_picture(self, img_tag):
-        p: Paragraph = self.document.add_paragraph()
-        p.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+        p: Paragraph = self.paragraphs.add_paragraph(fmt="centered")
         run: Run = p.add_run()
-        p.paragraph_format.first_line_indent = 0
 
         img_src: str
         scale: float = 100  # 优先级最高，单位 %
@@ -120,89 +193,80 @@ class DocxProcessor:
                 if attr.find("zoom") != -1:
                     scale = int(re.findall(r"\d+", attr)[0])
 
-        if img_tag["src"] != "":
-            img_src = img_tag["src"]
-            # 网络图片
-            if img_src.startswith("http://") or img_src.startswith("https://"):
-                print("[IMAGE] fetching:", img_src)
+        url = remote_src(img_tag)
+        if url is not None:
+            # 网络图片，已在 prefetch_images 中并发下载
+            image_bytes = self.remote_image(url)
+            if isinstance(image_bytes, Exception):
+                logger.warning("image %s could not be downloaded: %s", url, image_bytes)
+            else:
                 try:
-                    image_bytes = urlopen(img_src, timeout=10).read()
-                    data_stream = io.BytesIO(image_bytes)
-                    run.add_picture(data_stream, width=Inches(5.7 * scale / 100))
+                    self.image_registry.add_picture(run, image_bytes, width=Inches(5.7 * scale / 100))
                 except Exception as e:
-                    print("[RESOURCE ERROR]:", e)
-            else:
-                # 本地图片
-                run.add_picture(img_src, width=Inches(5.7 * scale / 100))
+                    logger.warning("image %s could not be embedded: %s", url, e)
         else:
-            # 网络图片
-            img_src = img_tag["title"]
-            print("[IMAGE] fetching:", img_src)
-            try:
-                image_bytes = urlopen(img_src, timeout=10).read()
-                data_stream = io.BytesIO(image_bytes)
-                run.add_picture(data_stream, width=Inches(5.7 * scale / 100))
-            except Exception as e:
-                print("[RESOURCE ERROR]:", e)
+            # 本地图片
+            self.image_registry.add_picture(run, self.resolve_path(img_tag["src"]), width=Inches(5.7 * scale / 100))
 
         # 如果选择展示图片描述，那么描述会在图片下方显示
         if show_image_desc and img_tag.get("alt"):
-            # TODO 图片描述的显示样式
-            desc: Paragraph = self.document.add_paragraph(img_tag["alt"], style=MDX_STYLE.CAPTION)
-            desc.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-            desc.style.font.color.rgb = RGBColor(11, 11, 11)
-            desc.style.font.bold = False
-            desc.paragraph_format.first_line_indent = 0
+            self.paragraphs.add_paragraph(img_tag["alt"], style=MDX_STYLE.CAPTION, fmt="centered")
+            self.tweak_style("caption")
 
+    @timed("table")
     def add_table(self, table_root):
-        # 统计列数
-        col_count: int = 0
-        for col in table_root.thead.tr.contents:
-            if col.string != "\n":
-                col_count += 1
-
-        table = self.document.add_table(0, col_count, style=MDX_STYLE.TABLE)  # TODO 表格样式
-
-        # 表格头行
-        head_row_cells = table.add_row().cells
-        i = 0
-        for col in table_root.thead.tr.contents:
-            if col.string == "\n":
-                continue
-            head_row_cells[i].paragraphs[0].add_run(col.string).bold = True  # TODO 表内单元格字符样式
-            i += 1
+        header = [cell_text(col) for col in table_root.thead.tr.contents if col.string != "\n"]
+        rows = [[cell_text(td) for td in tr.contents if td.string != "\n"]
+                for tr in table_root.tbody if tr.string != "\n"]
 
-        # 数据行
-        for tr in table_root.tbody:
-            if tr.string == "\n":
-                continue
-            row_cells = table.add_row().cells
-            i = 0
-            for td in tr.contents:
-                if td.string == "\n":
-                    continue
-                row_cells[i].text = td.string
-                i += 1
+        layout = self.table_layout
+        if layout is None or not layout.is_large(len(rows)):
+            self._add_table(header, rows)
+            return
 
+        # 大表格：拆分为多个带重复表头、固定列宽的表格
+        widths = layout.column_widths(header, rows, self.document._block_width)
+        for start in range(0, len(rows), layout.chunk_rows):
+            if start:
+                self.document.add_paragraph()  # 相邻的表格在 Word 中会合并，用空段落隔开
+            self._add_table(header, rows[start:start + layout.chunk_rows], widths=widths, repeat_header=True)
+            if self.writer is not None:
+                self.writer.flush()
+
+    def _add_table(self, header: list, rows: list, widths: list = None, repeat_header: bool = False):
+        table = self.document.add_table(0, len(header), style=MDX_STYLE.TABLE)  # TODO 表格样式
+        if widths is not None:
+            table.autofit = False
+            for grid_col, width in zip(table._tbl.tblGrid.gridCol_lst, widths):
+                grid_col.w = width
+
+        # 逐行复制预先构造好的行模板，避免 python-docx 逐个单元格访问的开销
+        builder = TableBuilder(table)
+        builder.add_header(header, repeat=repeat_header)  # TODO 表内单元格字符样式
+        builder.add_rows(rows)
+        return table
+
+    @timed("number_list")
     def add_number_list(self, number_list):
         # print(number_list.contents, "\n")
         num: int = 1  # 序号
         for item in number_list.children:
             if item.string == "\n":
                 continue
-            self.add_paragraph(item, p_style=MDX_STYLE.LIST_NUMBER) \
-                .style.paragraph_format.space_after = Pt(1)  # TODO 数字列表样式
+            self.add_paragraph(item, p_style=MDX_STYLE.LIST_NUMBER)
+            self.tweak_style("list-number")
 
             if hasattr(item, "ol") and item.ol is not None:  # 有子序列
                 sub_num: int = 1  # 子序号
                 for item2 in item.ol.children:
                     if item2.string == "\n":
                         continue
-                    self.add_paragraph(item2, prefix="(%d). " % sub_num, p_style=MDX_STYLE.LIST_CONTINUE) \
-                        .style.paragraph_format.first_line_indent = 0  # TODO 数字列表样式
+                    self.add_paragraph(item2, prefix="(%d). " % sub_num, p_style=MDX_STYLE.LIST_CONTINUE)
+                    self.tweak_style("list-continue-number")
                     sub_num += 1
             num += 1
 
+    @timed("bullet_list")
     def add_bullet_list(self, bullet_list):
         # 有可能是TODO list
         text = str(bullet_list.contents[1].string).strip()
@@ -213,40 +277,45 @@ class DocxProcessor:
             text: str = str(item.string)
             if text == "\n":
                 continue
-            self.add_paragraph(item, p_style=MDX_STYLE.LIST_BULLET) \
-                .style.paragraph_format.space_after = Pt(1)  # TODO 无序列表样式 ·• ‣°º৹ ■ ◻ ■ □ ◉◎ ●◌
+            self.add_paragraph(item, p_style=MDX_STYLE.LIST_BULLET)
+            self.tweak_style("list-bullet")
 
             if hasattr(item, "ul") and item.ul is not None:  # 有子序列
                 for item2 in item.ul.children:
                     if item2.string == "\n":
                         continue
                     # list_para.add_run("   ◉ " + str(item2.string) + "\n")
-                    self.add_paragraph(item2, prefix="•  ", p_style=MDX_STYLE.LIST_CONTINUE) \
-                        .style.paragraph_format.space_after = Pt(1)  # TODO 数字列表样式
+                    self.add_paragraph(item2, prefix="•  ", p_style=MDX_STYLE.LIST_CONTINUE)
+                    self.tweak_style("list-continue-bullet")
 
     # 伪TODO list
+    @timed("todo_list")
     def add_todo_list(self, todo_list):
         # list_para.style.font.name = "Consolas"
         for item in todo_list.children:
             if item.string == "\n":
                 continue
             text: str = item.string
-            list_para = self.document.add_paragraph(style=MDX_STYLE.PLAIN_LIST)
+            list_para = self.paragraphs.add_paragraph(style=MDX_STYLE.PLAIN_LIST)
+            runs = RunBuilder(list_para)
             if text.startswith("[x]"):
-                list_para.add_run("[ √ ]").font.name = "Consolas"
-                list_para.add_run(text.replace("[x]", " ", 1))
+                runs.add("[ √ ]", _CODE)
+                runs.add(text.replace("[x]", " ", 1))
             if text.startswith("[ ]"):
-                list_para.add_run("[   ]").font.name = "Consolas"
-                list_para.add_run(text.replace("[ ]", " ", 1))
+                runs.add("[   ]", _CODE)
+                runs.add(text.replace("[ ]", " ", 1))
+            runs.flush()
 
     # 分割线，转换为 Word 中的分页符
+    @timed("page_break")
     def add_split_line(self):
         self.document.add_page_break()
 
     # 超链接
-    def add_link(self, p: Paragraph, text: str, href: str):
-        """添加超链接"""
-        debug("[link]:", text, "[href]:", href)
+    @timed("link")
+    def add_link(self, p: Paragraph, text: str, href: str, formats: frozenset = PLAIN):
+        """添加超链接，formats 为链接所在位置的行内格式"""
+        logger.debug("[link]: %s [href]: %s", text, href)
         # 创建超链接
         part = p.part
         r_id = part.relate_to(href, RELATIONSHIP_TYPE.HYPERLINK, is_external=True)
@@ -255,29 +324,26 @@ class DocxProcessor:
         hyperlink = OxmlElement('w:hyperlink')
         hyperlink.set(qn('r:id'), r_id)
         
-        # 创建文本运行元素
+        # 创建文本运行元素，不设置格式时不需要 w:rPr
         new_run = OxmlElement('w:r')
-        rPr = OxmlElement('w:rPr')
-        new_run.append(rPr)
         new_run.text = text
+        if formats:
+            new_run.insert(0, copy.deepcopy(rpr_template(formats)))
         hyperlink.append(new_run)
         
         # 将超链接添加到段落
         p._p.append(hyperlink)
         
         # 设置超链接样式
-        run = p.add_run()
-        run.font.color.rgb = RGBColor(0, 0, 255)
-        run.font.underline = True
+        p._p.add_r().append(copy.deepcopy(rpr_template(_HYPERLINK)))
 
+    @timed("paragraph")
     def add_paragraph(self, children, p_style: str = None, prefix: str = ""):
         if not children:
             return
 
         if isinstance(children, str):
-            p = self.document.add_paragraph(prefix + children)
-            if p_style:
-                p.style = p_style
+            self.paragraphs.add_paragraph(prefix + children, style=p_style or None)
             return
 
         # 处理特殊标签
@@ -306,22 +372,30 @@ class DocxProcessor:
             self.add_blockquote(children)
             return
 
-        p = self.document.add_paragraph(prefix, style=p_style)
+        p = self.paragraphs.add_paragraph(prefix, style=p_style)
         if type(children) == str:
             p.add_run(children)
             return p
-        for elem in children.contents:  # 遍历一个段落内的所有元素
+        self.add_inline(p, children)
+        return p
+
+    def add_inline(self, p: Paragraph, children):
+        """
+        写入一个段落内的所有行内元素
+
+        一次遍历行内子树，嵌套的样式叠加在一起（如 <u>**又加粗又*斜体*又下划线**</u>），
+        格式相同的相邻文本合并为一个 run，每种格式组合的 w:rPr 只构造一次。
+        """
+        def on_element(elem, formats):
             if elem.name == "a":
-                self.add_link(p, elem.string, elem["href"])
-            elif elem.name == "img":
+                self.add_link(p, elem.get_text(), elem["href"], formats)
+            else:
                 self.add_picture(elem)
-            elif elem.name is not None:  # 有字符样式的子串
-                self.add_run(p, elem.string, elem.name)
-            elif not elem.string == "\n":  # 无字符样式的子串
-                self.add_run(p, elem)
-        return p
+
+        walk_inline(children, RunBuilder(p), on_element)
 
     # from docx.enum.style import WD_STYLE
+    @timed("blockquote")
     def add_blockquote(self, children):
         # TODO 将引用块放在1x1的表格中，优化引用块的显示效果
         #  设置左侧缩进，上下行距
@@ -335,15 +409,7 @@ class DocxProcessor:
                 if type(child) == str:
                     p.add_run(child)
                     return p
-                for elem in child.contents:  # 遍历一个段落内的所有元素
-                    if elem.name == "a":
-                        self.add_link(p, elem.string, elem["href"])
-                    elif elem.name == "img":
-                        self.add_picture(elem)
-                    elif elem.name is not None:  # 有字符样式的子串
-                        self.add_run(p, elem.string, elem.name)
-                    elif not elem.string == "\n":  # 无字符样式的子串
-                        self.add_run(p, elem)
+                self.add_inline(p, child)
 
         shading_elm_1 = parse_xml(r'<w:shd {} w:fill="efefef"/>'.format(nsdecls('w')))
         table.rows[0].cells[0]._tc.get_or_add_tcPr().append(shading_elm_1)
@@ -369,30 +435,100 @@ class DocxProcessor:
         # 打开HTML
         with open(html_path, 'r', encoding="UTF-8") as html_file:
             html_str = html_file.read()
+        self.render(html_str, base_dir=os.path.dirname(os.path.abspath(html_path)))
+        self.save(docx_path)
+
+    def render(self, html_str: str, base_dir: str = None):
+        """
+        将 HTML 字符串逐个标签写入文档，不产生任何中间文件
+
+        Args:
+            html_str: md2html_str 生成的 HTML
+            base_dir: 相对路径图片所在的目录
+        """
+        # 只有 HTML 输入才需要 BeautifulSoup，Markdown 输入走 render_tree
+        from bs4 import BeautifulSoup
+
         soup = BeautifulSoup(html_str, 'html.parser')
-        body_tag = soup.contents[2]
-        # 将工作目录切换到指定目录
-        os.chdir(os.path.dirname(os.path.abspath(html_path)))
-        # 逐个解析标签，并写到word中
-        for root in body_tag.children:
-            if root.string != "\n":
-                # debug("<%s>" % root.name)
-                if root.name == "p":  # 普通段落
-                    self.add_paragraph(root, p_style=MDX_STYLE.PLAIN_TEXT)
-                if root.name == "blockquote":  # 引用块
-                    self.add_blockquote(root)
-                if root.name == "ol":  # 数字列表
-                    self.add_number_list(root)
-                if root.name == "ul":  # 无序列表 或 TODO_List
-                    self.add_bullet_list(root)
-                if root.name == "table":  # 表格
-                    self.add_table(root)
-                if root.name == "hr":
-                    self.add_split_line()
-                if root.name == "pre":
-                    self.add_code_block(root)
-                if root.name == "h1" or root.name == "h2" or \
-                        root.name == "h3" or root.name == "h4" or root.name == "h5":
-                    self.add_heading(root.string, root.name)
-
-        self.document.save(docx_path)
+        return self.render_tree(soup.contents[2], base_dir=base_dir)
+
+    def render_tree(self, body_tag, base_dir: str = None):
+        """
+        将已解析的元素树逐个标签写入文档
+
+        Args:
+            body_tag: BeautifulSoup 的 body 标签，或 md2tree 返回的 TreeNode
+            base_dir: 相对路径图片所在的目录
+        """
+        self.base_dir = base_dir
+        stats = self.stats or ConversionStats()  # 不统计时用一个临时对象，省去到处判断
+        try:
+            with stats.stage("images"):
+                self.prefetch_images(body_tag)
+            # 逐个解析标签，并写到word中
+            with stats.stage("render"):
+                for root in body_tag.children:
+                    if root.string != "\n":
+                        stats.blocks += 1
+                        self.render_block(root)
+                        if self.writer is not None:
+                            self.writer.flush()
+        except BaseException:
+            self.abort()
+            raise
+        return self
+
+    def render_block(self, root):
+        """渲染一个顶层标签"""
+        # debug("<%s>" % root.name)
+        if root.name == "p":  # 普通段落
+            self.add_paragraph(root, p_style=MDX_STYLE.PLAIN_TEXT)
+        if root.name == "blockquote":  # 引用块
+            self.add_blockquote(root)
+        if root.name == "ol":  # 数字列表
+            self.add_number_list(root)
+        if root.name == "ul":  # 无序列表 或 TODO_List
+            self.add_bullet_list(root)
+        if root.name == "table":  # 表格
+            self.add_table(root)
+        if root.name == "hr":
+            self.add_split_line()
+        if root.name == "pre":
+            self.add_code_block(root)
+        if root.name == "h1" or root.name == "h2" or \
+                root.name == "h3" or root.name == "h4" or root.name == "h5":
+            self.add_heading(root.string, root.name)
+
+    def save(self, target=None):
+        """
+        保存文档，target 可以是文件路径，也可以是可写的二进制流
+
+        流式输出时已在 stream_to 中指定了输出位置，这里只写出剩余部分，忽略 target。
+        """
+        stats = self.stats or ConversionStats()
+        with stats.stage("save"):
+            if self.writer is not None:
+                target = self.writer.target
+                try:
+                    self.writer.close()
+                except BaseException:
+                    self.abort()
+                    raise
+            else:
+                self.document.save(target)
+        stats.bytes_written = output_size(target)
+
+    def abort(self):
+        """渲染或写出失败时放弃流式输出，不留下不完整的文件"""
+        if self.writer is not None:
+            self.writer.abort()
+
+    def to_bytes(self) -> bytes:
+        """以 bytes 形式返回 .docx 内容"""
+        stats = self.stats or ConversionStats()
+        with stats.stage("save"):
+            stream = io.BytesIO()
+            self.document.save(stream)
+            data = stream.getvalue()
+        stats.bytes_written = len(data)
+        return data
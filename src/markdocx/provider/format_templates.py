@@ -0,0 +1,82 @@
+import copy
+
+from docx.enum.style import WD_STYLE_TYPE
+from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+from docx.oxml.shared import OxmlElement
+from docx.shared import Pt
+from docx.text.paragraph import Paragraph
+from docx.text.parfmt import ParagraphFormat
+
+from ..provider.run_builder import PLAIN, RunBuilder
+
+
+def _code_block(fmt: ParagraphFormat):
+    fmt.first_line_indent = 0
+    fmt.left_indent = Pt(20)  # 左缩进
+    fmt.space_before = Pt(10)  # 段前间距
+    fmt.space_after = Pt(10)  # 段后间距
+
+
+def _centered(fmt: ParagraphFormat):
+    fmt.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+    fmt.first_line_indent = 0
+
+
+# 段落格式名 -> 设置函数，与段落样式组合成 w:pPr 模板
+PARAGRAPH_FORMATS = {
+    "code": _code_block,  # 代码块
+    "centered": _centered,  # 图片及其描述
+}
+
+
+class ParagraphTemplates:
+    """
+    按文档缓存每种 (段落样式, 段落格式) 组合的 w:pPr 模板
+
+    python-docx 的 add_paragraph(style=...) 每次都要按名称查找样式、再与默认样式比较，
+    是渲染段落时最大的开销；代码块、图片描述等再逐个设置缩进、间距，每个属性都要查找或创建一次子元素。
+    这里每种组合只通过 python-docx 构造一次 w:pPr，之后的段落直接复制，生成的 XML 与逐个设置完全一致。
+    样式 ID 取决于文档的样式表，因此模板属于单个文档，不能在文档间共用。
+    """
+
+    __slots__ = ("document", "_templates")
+
+    def __init__(self, document):
+        self.document = document
+        self._templates = {}  # (样式名, 格式名) -> w:pPr，无需 w:pPr 时为 None
+
+    def ppr(self, style: str = None, fmt: str = None):
+        """取 w:pPr 模板，第一次用到时构造"""
+        key = (style, fmt)
+        try:
+            return self._templates[key]
+        except KeyError:
+            pass
+        p = OxmlElement("w:p")
+        if style is not None:
+            # 与 Paragraph.style 相同，默认样式不写出 w:pStyle
+            p.style = self.document.part.get_style_id(style, WD_STYLE_TYPE.PARAGRAPH)
+        if fmt is not None:
+            PARAGRAPH_FORMATS[fmt](ParagraphFormat(p))
+        pPr = self._templates[key] = p.pPr
+        return pPr
+
+    def add_paragraph(self, text: str = "", style: str = None, fmt: str = None, formats: frozenset = PLAIN) -> Paragraph:
+        """
+        在文档末尾添加段落，等同于 document.add_paragraph(text, style) 后再设置 fmt 对应的段落格式
+
+        Args:
+            text: 段落文本，为空时不添加 run
+            style: 段落样式名，见 MDX_STYLE
+            fmt: PARAGRAPH_FORMATS 中的段落格式名
+            formats: 文本的行内格式，见 run_builder.INLINE_FORMATS
+        """
+        p = self.document.add_paragraph()
+        pPr = self.ppr(style, fmt)
+        if pPr is not None:
+            p._p.insert(0, copy.deepcopy(pPr))
+        if text:
+            runs = RunBuilder(p)
+            runs.add(text, formats)
+            runs.flush()
+        return p
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import NamedTuple, Optional
+
+
+class CacheEntry(NamedTuple):
+    data: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+
+class ImageCache:
+    """
+    网络图片的磁盘缓存
+
+    以 URL 为键，每个条目是一个 .bin 文件：第一行是 JSON 元数据（URL、ETag、Last-Modified、下载时间），其后是图片数据。
+    - 未超过 ttl 的条目直接使用；过期后由 ImageFetcher 带上 If-None-Match / If-Modified-Since 重新验证；
+    - 总大小超过 max_bytes 时，按最近使用时间（文件的 mtime）淘汰最旧的条目；
+    - 元数据和数据在同一个文件中，先写临时文件再 os.replace，读到的 ETag 与数据总是同一次下载的，
+      多个进程可以安全地共用同一个目录；中断的写入留下的临时文件在淘汰时清理。
+    """
+
+    _SUFFIX = ".bin"
+    _STALE_TMP_SECONDS = 3600  # 超过该时间仍未替换的临时文件视为中断的写入
+
+    def __init__(self, directory, ttl: float = 24 * 3600, max_bytes: int = 256 * 1024 * 1024):
+        self.directory = str(directory)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._size: Optional[int] = None  # 估算的缓存总大小，超限时才扫描目录
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, url: str, suffix: str) -> str:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key + suffix)
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        try:
+            with open(self._path(url, self._SUFFIX), "rb") as entry_file:
+                header = entry_file.readline()
+                meta = json.loads(header)
+                data = entry_file.read()
+        except (OSError, ValueError):  # 不存在，或是旧版本的缓存格式
+            return None
+        if not isinstance(meta, dict) or meta.get("url") != url:
+            return None
+        return CacheEntry(data, meta.get("etag"), meta.get("last_modified"), meta.get("fetched_at", 0))
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return time.time() - entry.fetched_at < self.ttl
+
+    def touch(self, url: str):
+        """记录一次使用，用于 LRU 淘汰"""
+        try:
+            os.utime(self._path(url, self._SUFFIX))
+        except OSError:
+            pass
+
+    def put(self, url: str, data: bytes, etag: str = None, last_modified: str = None):
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.time(),
+        }
+        # json.dumps 的结果不含换行，元数据占第一行
+        blob = json.dumps(meta).encode("utf-8") + b"\n" + data
+        self._write_atomic(self._path(url, self._SUFFIX), blob)
+
+        if self._size is None or self._size + len(blob) > self.max_bytes:
+            self.evict()
+        else:
+            self._size += len(blob)
+
+    def _write_atomic(self, path: str, data: bytes):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                tmp_file.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def evict(self):
+        """淘汰最久未使用的条目，直到总大小不超过 max_bytes"""
+        entries = []
+        total = 0
+        stale = time.time() - self._STALE_TMP_SECONDS
+        for item in os.scandir(self.directory):
+            is_tmp = item.name.endswith(".tmp")
+            if not is_tmp and not item.name.endswith(self._SUFFIX):
+                continue
+            try:
+                stat = item.stat()
+            except OSError:  # 已被其他进程删除
+                continue
+            if is_tmp:
+                if stat.st_mtime < stale:  # 其他进程正在写入的临时文件不删除
+                    self._unlink(item.path)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, item.path))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._unlink(path)
+            total -= size
+        self._size = total
+
+    @staticmethod
+    def _unlink(path: str):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    def clear(self):
+        for item in os.scandir(self.directory):
+            if item.name.endswith((self._SUFFIX, ".json", ".tmp")):  # .json 为旧版本的元数据文件
+                self._unlink(item.path)
+        self._size = 0
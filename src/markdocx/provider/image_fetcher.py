@@ -0,0 +1,176 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from ..provider.image_cache import ImageCache
+
+logger = logging.getLogger(__name__)
+
+
+def is_remote(src: str) -> bool:
+    return src.startswith("http://") or src.startswith("https://")
+
+
+def remote_src(img_tag):
+    """
+    返回 img 标签对应的网络图片地址，本地图片返回 None
+
+    `![desc]("https://...")` 这种写法的地址会被 Python-Markdown 解析到 title 中，src 为空。
+    """
+    src = img_tag.get("src", "")
+    if src == "":
+        return img_tag.get("title") or None
+    return src if is_remote(src) else None
+
+
+class ImageFetcher:
+    """
+    网络图片下载器
+
+    在渲染之前，先收集文档中所有网络图片的地址，用线程池并发下载；
+    同一个 ImageFetcher 内的请求复用 HTTP 连接。
+    指定 cache 时，未过期的图片直接从磁盘读取，过期的图片用 ETag / Last-Modified 做条件请求。
+    """
+
+    def __init__(self, max_workers: int = 8, timeout: float = 10, cache: ImageCache = None):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.cache = cache
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        """第一次下载时才导入 requests 并建立连接池，没有网络图片的文档不需要它"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._session = session
+        return self._session
+
+    def _lookup(self, url: str):
+        """
+        查询缓存，返回 (缓存条目, 请求头)；条目未过期时请求头为 None，直接使用缓存的数据
+        """
+        entry = self.cache.get(url) if self.cache is not None else None
+        if entry is not None and self.cache.is_fresh(entry):
+            self.cache.touch(url)
+            return entry, None
+
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return entry, headers
+
+    def _not_modified(self, url: str, entry, response_headers) -> bytes:
+        # 未修改，刷新缓存的下载时间
+        self.cache.put(url, entry.data, response_headers.get("ETag", entry.etag),
+                       response_headers.get("Last-Modified", entry.last_modified))
+        return entry.data
+
+    def _store(self, url: str, response_headers, content: bytes) -> bytes:
+        if self.cache is not None:
+            self.cache.put(url, content, response_headers.get("ETag"), response_headers.get("Last-Modified"))
+        return content
+
+    def fetch(self, url: str) -> bytes:
+        entry, headers = self._lookup(url)
+        if headers is None:
+            return entry.data
+
+        logger.info("fetching image: %s", url)
+        response = self.session.get(url, timeout=self.timeout, headers=headers)
+        if response.status_code == 304 and entry is not None:
+            return self._not_modified(url, entry, response.headers)
+        response.raise_for_status()
+        return self._store(url, response.headers, response.content)
+
+    async def afetch(self, session, url: str) -> bytes:
+        """用 aiohttp 的 ClientSession 下载，缓存的处理与 fetch 相同，读写磁盘缓存在默认线程池中执行"""
+        import asyncio
+        loop = asyncio.get_running_loop()
+        if self.cache is None:
+            entry, headers = None, {}
+        else:
+            entry, headers = await loop.run_in_executor(None, self._lookup, url)
+        if headers is None:
+            return entry.data
+
+        logger.info("fetching image: %s", url)
+        async with session.get(url, headers=headers) as response:
+            if response.status == 304 and entry is not None:
+                return await loop.run_in_executor(None, self._not_modified, url, entry, response.headers)
+            response.raise_for_status()
+            content = await response.read()
+        if self.cache is None:
+            return content
+        return await loop.run_in_executor(None, self._store, url, response.headers, content)
+
+    def _fetch_or_error(self, url: str):
+        try:
+            return self.fetch(url)
+        except Exception as e:
+            return e
+
+    def prefetch(self, urls) -> dict:
+        """
+        并发下载，返回 {url: bytes 或下载时的异常}
+        """
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return {}
+        if len(urls) == 1 or self.max_workers <= 1:
+            return {url: self._fetch_or_error(url) for url in urls}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as executor:
+            return dict(zip(urls, executor.map(self._fetch_or_error, urls)))
+
+    async def aprefetch(self, urls) -> dict:
+        """
+        prefetch 的 asyncio 版本，返回 {url: bytes 或下载时的异常}
+
+        安装了 aiohttp 时在事件循环中并发下载（同时最多 max_workers 个请求），
+        否则退回到在默认线程池中用 requests 下载。
+        """
+        import asyncio  # 只有异步调用者需要，不增加同步转换的导入耗时
+
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return {}
+        aiohttp = _import_aiohttp()
+        if aiohttp is None:
+            loop = asyncio.get_running_loop()
+            results = await asyncio.gather(*(loop.run_in_executor(None, self._fetch_or_error, url)
+                                             for url in urls))
+            return dict(zip(urls, results))
+
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def fetch_or_error(session, url):
+            async with semaphore:
+                try:
+                    return await self.afetch(session, url)
+                except Exception as e:
+                    return e
+
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            results = await asyncio.gather(*(fetch_or_error(session, url) for url in urls))
+        return dict(zip(urls, results))
+
+
+def _import_aiohttp():
+    try:
+        import aiohttp
+    except ImportError:  # aiohttp 是可选依赖
+        return None
+    return aiohttp
@@ -0,0 +1,104 @@
+import hashlib
+import io
+import logging
+import threading
+from collections import OrderedDict
+
+from docx.shared import Emu
+
+logger = logging.getLogger(__name__)
+
+
+class ImageOptimizer:
+    """
+    图片优化：按显示尺寸重新采样过大的图片，并重新压缩
+
+    图片在 Word 中的显示宽度是固定的（见 DocxProcessor.add_picture），超出 显示宽度 × dpi 的像素
+    只会让文件变大、保存变慢。优化结果按 (图片内容, 目标像素) 缓存，可在多次转换间共用。
+    """
+
+    def __init__(self, dpi: int = 150, max_pixels: int = 2400, jpeg_quality: int = 85,
+                 png_compress_level: int = 9, cache_size: int = 256):
+        self.dpi = dpi
+        self.max_pixels = max_pixels
+        self.jpeg_quality = jpeg_quality
+        self.png_compress_level = png_compress_level
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_conf(cls, conf: dict):
+        """
+        从样式配置的 image 段创建，未启用或未安装 Pillow 时返回 None
+        """
+        if not conf or not conf.get("optimize"):
+            return None
+        if _import_pil() is None:  # 只在启用优化时才导入 Pillow
+            logger.warning("image.optimize requires Pillow (pip install Pillow). Images are embedded as-is.")
+            return None
+        return cls(dpi=conf.get("dpi", 150),
+                   max_pixels=conf.get("max-pixels", 2400),
+                   jpeg_quality=conf.get("jpeg-quality", 85),
+                   png_compress_level=conf.get("png-compress-level", 9))
+
+    def target_pixels(self, width) -> int:
+        """显示宽度（EMU）对应的目标像素宽度"""
+        if width is None:
+            return self.max_pixels
+        return max(1, min(self.max_pixels, round(Emu(width).inches * self.dpi)))
+
+    def optimize(self, data: bytes, width=None) -> bytes:
+        """
+        返回优化后的图片；无需处理、格式不支持或处理后反而更大时返回原图
+        """
+        target = self.target_pixels(width)
+        key = (hashlib.sha1(data).digest(), target)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        result = self._resample(data, target)
+
+        with self._lock:
+            self._cache[key] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def _resample(self, data: bytes, target: int) -> bytes:
+        PILImage = _import_pil()
+        try:
+            image = PILImage.open(io.BytesIO(data))
+            image_format = image.format
+            if image_format not in ("JPEG", "PNG"):
+                return data
+            width, height = image.size
+            # 长边不超过 max_pixels，宽度不超过显示所需
+            scale = min(target / width, self.max_pixels / max(width, height))
+            if scale < 1:
+                size = (max(1, round(width * scale)), max(1, round(height * scale)))
+                image = image.resize(size, PILImage.LANCZOS)
+
+            out = io.BytesIO()
+            if image_format == "JPEG":
+                if image.mode not in ("RGB", "L", "CMYK"):
+                    image = image.convert("RGB")
+                image.save(out, "JPEG", quality=self.jpeg_quality, optimize=True)
+            else:
+                image.save(out, "PNG", optimize=True, compress_level=self.png_compress_level)
+        except Exception as e:
+            logger.warning("image optimization failed: %s", e)
+            return data
+
+        result = out.getvalue()
+        return result if len(result) < len(data) else data
+
+
+def _import_pil():
+    try:
+        from PIL import Image
+    except ImportError:  # Pillow 是可选依赖
+        return None
+    return Image
@@ -0,0 +1,92 @@
+import hashlib
+import io
+
+from docx.image.image import Image
+from docx.oxml.shape import CT_Inline
+from docx.text.run import Run
+
+from ..provider.image_optimizer import ImageOptimizer
+
+
+class ImageRegistry:
+    """
+    单次转换内的图片登记表
+
+    python-docx 的 run.add_picture 每次都会重新读取、解析图片头并在所有图片 part 中按 SHA1 查找，
+    还要用 xpath 扫描整个文档来分配图形 id。这里按内容哈希（本地图片再按路径）记住已经嵌入的
+    图片 part、关系 id 和尺寸信息，重复出现的图片直接复用，并自行递增分配图形 id。
+    指定 optimizer 时，图片先按显示宽度优化再嵌入。
+    """
+
+    def __init__(self, part, optimizer: ImageOptimizer = None):
+        self.part = part
+        self.optimizer = optimizer
+        self._by_hash = {}  # sha1 -> (rId, docx.image.image.Image)
+        self._by_path = {}  # 本地路径 -> sha1
+        self._optimized = {}  # (本地路径或 sha1, 显示宽度) -> 优化后的 bytes
+        self._next_id = None
+
+    def add_picture(self, run: Run, source, width=None, height=None):
+        """
+        在 run 中插入图片
+
+        Args:
+            run: 图片所在的 run
+            source: 本地图片路径，或图片的 bytes
+            width, height: 显示尺寸（EMU），只给一个时按比例缩放
+        """
+        if self.optimizer is not None:
+            source = self.optimize(source, width)
+        rId, image = self.get_or_add_image(source)
+        cx, cy = image.scaled_dimensions(width, height)
+        inline = CT_Inline.new_pic_inline(self.next_id(), rId, image.filename, cx, cy)
+        run._r.add_drawing(inline)
+        return inline
+
+    def get_or_add_image(self, source, filename: str = None):
+        """
+        登记图片，返回 (rId, docx.image.image.Image)
+
+        Args:
+            source: 本地图片路径，或图片的 bytes
+            filename: source 为 bytes 时图片的原文件名（写入图形的 name 属性），
+                默认与 python-docx 相同为 image.<扩展名>
+        """
+        if isinstance(source, bytes):
+            sha1 = hashlib.sha1(source).hexdigest()
+            if sha1 not in self._by_hash:
+                rId, image = self.part.get_or_add_image(io.BytesIO(source))
+                if filename and filename != image.filename:
+                    # noinspection PyProtectedMember
+                    image = Image._from_stream(io.BytesIO(source), source, filename)
+                self._by_hash[sha1] = (rId, image)
+            return self._by_hash[sha1]
+
+        sha1 = self._by_path.get(source)
+        if sha1 is None:
+            rId, image = self.part.get_or_add_image(source)
+            sha1 = image.sha1
+            self._by_path[source] = sha1
+            # 内容相同但路径不同的图片，沿用先登记的结果
+            self._by_hash.setdefault(sha1, (rId, image))
+        return self._by_hash[sha1]
+
+    def optimize(self, source, width) -> bytes:
+        key = (source if isinstance(source, str) else hashlib.sha1(source).digest(), width)
+        if key not in self._optimized:
+            data = source
+            if isinstance(source, str):
+                with open(source, "rb") as image_file:
+                    data = image_file.read()
+            self._optimized[key] = self.optimizer.optimize(data, width)
+        return self._optimized[key]
+
+    def next_id(self) -> int:
+        if self._next_id is None:
+            self._next_id = self.part.next_id
+        shape_id = self._next_id
+        self._next_id += 1
+        return shape_id
+
+    def __len__(self) -> int:
+        return len(self._by_hash)
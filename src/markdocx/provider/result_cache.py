@@ -0,0 +1,218 @@
+import functools
+from abc import ABC, abstractmethod
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from .. import __version__
+from ..provider.image_fetcher import is_remote
+
+
+class ResultCache(ABC):
+    """
+    整篇文档的转换结果缓存，键相同时直接返回上次生成的 .docx bytes
+
+    键由 result_key 计算：库版本、样式、Markdown 内容和引用的本地图片内容。
+    子类实现 _get / _put 两个方法，hits / misses 记录命中和未命中的次数。
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        data = self._get(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes):
+        self._put(key, data)
+
+    @property
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[bytes]:
+        """取缓存的结果，不存在时返回 None"""
+
+    @abstractmethod
+    def _put(self, key: str, data: bytes):
+        """存入结果"""
+
+    def __getstate__(self):
+        # 传给批量转换的工作进程时，锁不能序列化，计数从零开始
+        state = self.__dict__.copy()
+        state.update(hits=0, misses=0)
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+class MemoryResultCache(ResultCache):
+    """进程内的 LRU 缓存，按条目数和总大小淘汰最久未使用的结果"""
+
+    def __init__(self, max_entries: int = 128, max_bytes: int = 256 * 1024 * 1024):
+        super().__init__()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+
+    def _get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def _put(self, key: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = data
+            self._size += len(data)
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, victim = self._entries.popitem(last=False)
+                self._size -= len(victim)
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state.update(_entries=OrderedDict(), _size=0)
+        return state
+
+
+class DirectoryResultCache(ResultCache):
+    """
+    本地目录中的缓存，每个结果一个 .docx 文件，可在多个进程和多次运行间共用
+
+    总大小超过 max_bytes 时按最近使用时间（文件的 mtime）淘汰最旧的结果，
+    写入先写临时文件再 os.replace，与 ImageCache 相同。
+    """
+
+    _SUFFIX = ".docx"
+
+    def __init__(self, directory, max_bytes: int = 512 * 1024 * 1024):
+        super().__init__()
+        self.directory = str(directory)
+        self.max_bytes = max_bytes
+        self._size: Optional[int] = None  # 估算的缓存总大小，超限时才扫描目录
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self._SUFFIX)
+
+    def _get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+            os.utime(path)  # 记录一次使用，用于 LRU 淘汰
+        except OSError:
+            return None
+        return data
+
+    def _put(self, key: str, data: bytes):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                tmp_file.write(data)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        if self._size is None or self._size + len(data) > self.max_bytes:
+            self.evict()
+        else:
+            self._size += len(data)
+
+    def evict(self):
+        """淘汰最久未使用的结果，直到总大小不超过 max_bytes"""
+        entries = []
+        total = 0
+        for item in os.scandir(self.directory):
+            if not item.name.endswith(self._SUFFIX):
+                continue
+            try:
+                stat = item.stat()
+            except OSError:  # 已被其他进程删除
+                continue
+            entries.append((stat.st_mtime, stat.st_size, item.path))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            total -= size
+        self._size = total
+
+    def clear(self):
+        for item in os.scandir(self.directory):
+            if item.name.endswith(self._SUFFIX):
+                try:
+                    os.unlink(item.path)
+                except OSError:
+                    pass
+        self._size = 0
+
+
+def result_key(markdown_string: str, compiled, body, base_dir: str = None) -> str:
+    """
+    计算转换结果的缓存键
+
+    Args:
+        markdown_string: Markdown 内容
+        compiled: 转换使用的 CompiledStyle
+        body: md2tree 解析出的文档树，用于找出引用的本地图片
+        base_dir: 相对路径图片所在的目录
+
+    网络图片只按地址计入，内容变化不会使缓存失效。
+    """
+    digest = hashlib.sha256()
+    for value in (__version__, compiled.fingerprint, markdown_string):
+        value = value.encode("utf-8")
+        digest.update(b"%d:" % len(value))
+        digest.update(value)
+    sources = {img.get("src", "") for img in body.find_all("img")}
+    for src in sorted(src for src in sources if src and not is_remote(src)):
+        path = os.path.join(base_dir, src) if base_dir and not os.path.isabs(src) else src
+        digest.update(("\0%s:" % src).encode("utf-8"))
+        try:
+            stat = os.stat(path)
+            digest.update(_file_digest(os.path.abspath(path), stat.st_mtime_ns, stat.st_size))
+        except OSError:  # 图片不存在时按渲染时的处理结果缓存
+            digest.update(b"missing")
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=1024)
+def _file_digest(path: str, mtime_ns: int, size: int) -> bytes:
+    """按 路径 + 修改时间 + 大小 缓存图片内容的哈希，未修改的图片不必每次重新读取"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.digest()
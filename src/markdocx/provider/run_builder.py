@@ -0,0 +1,148 @@
+import copy
+import logging
+import re
+
+from docx.enum.text import WD_COLOR_INDEX
+from docx.oxml.shared import OxmlElement
+from docx.shared import RGBColor
+from docx.text.font import Font
+
+# 行内标签 -> 对应的字符格式，未列出的标签（如 span）按普通文本处理
+INLINE_FORMATS = {
+    "strong": "bold",
+    "b": "bold",
+    "em": "italic",
+    "i": "italic",
+    "u": "underline",
+    "strike": "strike",
+    "del": "strike",
+    "s": "strike",
+    "sub": "subscript",
+    "sup": "superscript",
+    "highlight": "highlight",
+    "mark": "highlight",
+    "code": "code",
+}
+
+PLAIN = frozenset()
+
+logger = logging.getLogger(__name__)
+
+# w:t 中不能直接写入的字符，交给 python-docx 转换为 w:tab / w:br
+_RE_SPECIAL = re.compile(r"[\t\r\n]")
+
+_CODE_FONT = "Consolas"
+_rpr_templates = {}  # 格式名集合 -> 预先构造好的 w:rPr
+
+
+def rpr_template(formats: frozenset):
+    """
+    取一种格式组合对应的 w:rPr 模板，第一次用到时通过 python-docx 构造，之后直接复制
+
+    行内格式最多只有几十种组合，逐个属性设置 Font 的开销只在每种组合第一次出现时发生。
+    """
+    rPr = _rpr_templates.get(formats)
+    if rPr is None:
+        r = OxmlElement("w:r")
+        apply_formats(Font(r), formats)
+        rPr = _rpr_templates[formats] = r.rPr
+    return rPr
+
+
+def apply_formats(font: Font, formats):
+    """按格式名设置字体，只设置为 True 的属性"""
+    for name in formats:
+        if name == "highlight":
+            font.highlight_color = WD_COLOR_INDEX.YELLOW
+        elif name == "code":
+            font.name = _CODE_FONT
+        elif name == "hyperlink":  # 超链接后的蓝色下划线 run，不对应行内标签
+            font.color.rgb = RGBColor(0, 0, 255)
+            font.underline = True
+        else:
+            setattr(font, name, True)
+
+
+class RunBuilder:
+    """
+    合并段落中格式相同的相邻文本
+
+    add_paragraph 原先为每个行内子节点各建一个 run，且每个 run 都会因设置 highlight_color = None
+    而带上一个空的 w:rPr。这里记录当前待写出的文本和它的格式，格式不变时只拼接文本，
+    格式变化、遇到超链接或图片、或段落结束时才写出一个 w:r，并且只在确实设置了格式时才复制一份 w:rPr 模板。
+    """
+
+    __slots__ = ("p", "_texts", "_format")
+
+    def __init__(self, p):
+        """
+        Args:
+            p: 要写入的段落，python-docx 的 Paragraph
+        """
+        self.p = p
+        self._texts = []
+        self._format = PLAIN
+
+    def add(self, text: str, formats: frozenset = PLAIN):
+        """追加一段文本，formats 为 INLINE_FORMATS 中的格式名集合"""
+        if not text:
+            return
+        if formats != self._format:
+            self.flush()
+            self._format = formats
+        self._texts.append(text)
+
+    def flush(self):
+        """写出待合并的文本，在插入超链接、图片等其他行内元素前和段落结束时调用"""
+        if not self._texts:
+            return
+        text = "".join(self._texts)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[%s]: %s", ",".join(sorted(self._format)) or "plain", text)
+        r = self.p._p.add_r()
+        if _RE_SPECIAL.search(text):
+            r.text = text  # 与 Run.text 相同，\t \n 转换为 w:tab / w:br
+        else:
+            r.add_t(text)  # 不必逐个字符检查，首尾有空白时同样设置 xml:space
+        if self._format:
+            r.insert(0, copy.deepcopy(rpr_template(self._format)))
+        self._texts = []
+
+
+# 渲染行内元素时不展开的子标签：列表项中的子列表由列表的渲染逻辑单独处理
+_SKIPPED_TAGS = frozenset(("ol", "ul"))
+
+
+def walk_inline(node, runs: RunBuilder, on_element):
+    """
+    一次遍历段落的行内子树，用格式栈累积嵌套的格式，如 <u>**粗体 *斜体***</u> 中的“斜体”同时带有三种格式
+
+    Args:
+        node: 段落标签（TreeNode 或 bs4 的 Tag）
+        runs: 写入文本的 RunBuilder
+        on_element: 遇到超链接、图片时以 (标签, 当前格式) 调用，调用前已写出之前的文本
+    """
+    stack = [(iter(node.contents), PLAIN)]
+    after_br = False
+    while stack:
+        elem = next(stack[-1][0], None)
+        if elem is None:
+            stack.pop()
+            continue
+        formats = stack[-1][1]
+        name = elem.name
+        if name is None:  # 文本
+            if after_br and elem.startswith("\n"):
+                elem = elem[1:]  # Markdown 的硬换行在 <br> 之后还有一个换行符，只换一次行
+            if elem and elem != "\n":
+                runs.add(elem, formats)
+        elif name == "a" or name == "img":
+            runs.flush()
+            on_element(elem, formats)
+        elif name == "br":
+            runs.add("\n", formats)
+        elif name not in _SKIPPED_TAGS:
+            fmt = INLINE_FORMATS.get(name)
+            stack.append((iter(elem.contents), formats | {fmt} if fmt and fmt not in formats else formats))
+        after_br = name == "br"
+    runs.flush()
@@ -1,7 +1,11 @@
+import logging
+
 import docx
 
 from docx.enum.style import WD_STYLE_TYPE
 
+logger = logging.getLogger(__name__)
+
 
 # 中文的字号转 pt 方法
 def _zihao_to_pt(chn_name: str):
@@ -27,8 +31,7 @@ def _zihao_to_pt(chn_name: str):
     if pt_mapping.get(chn_name):
         return pt_mapping[chn_name]
     else:
-        print("[YAML ERROR]:", chn_name,
-              "不是一种规范的字号称呼。(中文语境下，字号最大是'初号'，最小是'八号')。")
+        logger.warning("%s 不是一种规范的字号称呼。(中文语境下，字号最大是'初号'，最小是'八号')。", chn_name)
 
 
 class SimpleStyle:
@@ -74,9 +77,8 @@ class SimpleStyle:
                     else:  # 如果是以中文形式给出的字号，进行转换
                         self.font_size = float(_zihao_to_pt(conf["font"]["size"]))
         except KeyError:
-            print("[YAML ERROR]:", style_name,
-                  "| Error occurred in setting font style. Set to:",
-                  self.font_default, self.font_east_asia, str(self.font_size) + "pt")
+            logger.warning("%s | Error occurred in setting font style. Set to: %s %s %spt",
+                           style_name, self.font_default, self.font_east_asia, self.font_size)
 
         # 颜色有指定时检查，不指定默认黑色
         if conf.get("font", {}).get("color") is not None:
@@ -91,12 +93,11 @@ class SimpleStyle:
                 else:
                     raise ValueError
             except ValueError:
-                print("[YAML ERROR]:", style_name,
-                      "| Value of color isn't a hex or out of [000000, FFFFFF].",
-                      "Default to black(000000).")
+                logger.warning("%s | Value of color isn't a hex or out of [000000, FFFFFF]. "
+                               "Default to black(000000).", style_name)
             except TypeError:
-                print("[YAML ERROR]:", style_name, "| Value of color must be string with 6 characters.",
-                      "Default to black(000000).")
+                logger.warning("%s | Value of color must be string with 6 characters. "
+                               "Default to black(000000).", style_name)
 
         # 加粗、斜体、下划线、删除线
         if conf.get("font", {}).get("extra"):
@@ -0,0 +1,126 @@
+# noinspection PyProtectedMember
+#
+import os
+import re
+import tempfile
+import zipfile
+
+from docx.opc.pkgwriter import PackageWriter
+from docx.oxml.ns import qn
+from lxml import etree
+
+# 块元素序列化时会重复声明根元素上已有的命名空间
+_RE_XMLNS = re.compile(rb'\sxmlns:(\w+)="([^"]*)"')
+
+
+class StreamingDocxWriter:
+    """
+    流式写出 .docx
+
+    python-docx 在内存中保存整棵文档树，最后一次性序列化，大文档的内存峰值是输出大小的数倍。
+    这里先打开 zip 中的 word/document.xml 条目，每渲染完一个顶层块就调用 flush，
+    把 body 中已完成的元素写入 zip 并从树中移除；样式、编号、图片和关系等其他部分在 close 时写出。
+    内存峰值取决于最大的单个块，而不是整个文档（嵌入的图片仍保存在内存中）。
+
+    输出到文件路径时先写入同一目录下的临时文件，close 成功后才替换为目标文件；
+    渲染失败时调用 abort 删除临时文件，不会留下不完整的 .docx。
+    """
+
+    def __init__(self, document, target):
+        """
+        Args:
+            document: 要写出的 python-docx 文档，写出过程中其 body 会被逐块清空
+            target: 文件路径或可写的二进制流
+        """
+        self.document = document
+        self.target = target
+        self.body = document.element.body
+        self._nsmap = {prefix.encode(): uri.encode() for prefix, uri in document.element.nsmap.items()}
+        self._tmp_path = None
+        if isinstance(target, (str, os.PathLike)):
+            fd, self._tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(target)),
+                                                  prefix=".markdocx-", suffix=".tmp")
+            os.close(fd)
+        self._zip = zipfile.ZipFile(self._tmp_path or target, "w", compression=zipfile.ZIP_DEFLATED)
+        self._entry = self._zip.open(document.part.partname.membername, "w")
+        self.closed = False
+        try:
+            self._entry.write(self._head())
+        except BaseException:
+            self.abort()
+            raise
+
+    def _head(self) -> bytes:
+        root = self.document.element
+        shell = etree.Element(root.tag, attrib=dict(root.attrib), nsmap=root.nsmap)
+        etree.SubElement(shell, qn("w:body"))
+        xml = etree.tostring(shell, encoding="UTF-8", standalone=True)
+        return xml[:xml.rindex(b"<w:body/>")] + b"<w:body>"
+
+    def _serialize(self, element) -> bytes:
+        xml = etree.tostring(element, encoding="UTF-8")
+        end = xml.index(b">")
+
+        def strip(match):
+            prefix, uri = match.groups()
+            return b"" if self._nsmap.get(prefix) == uri else match.group(0)
+
+        return _RE_XMLNS.sub(strip, xml[:end]) + xml[end:]
+
+    def flush(self):
+        """写出 body 中已渲染完的元素并释放它们，保留最后的 sectPr"""
+        sect_pr = qn("w:sectPr")
+        for element in list(self.body):
+            if element.tag == sect_pr:
+                continue
+            self._entry.write(self._serialize(element))
+            self.body.remove(element)
+
+    def close(self):
+        """写出剩余的块和文档的其他部分"""
+        if self.closed:
+            return
+        self.flush()
+        for element in list(self.body):
+            self._entry.write(self._serialize(element))
+        self._entry.write(b"</w:body></w:document>")
+        self._entry.close()
+
+        package = self.document.part.package
+        parts = list(package.iter_parts())
+        for part in parts:
+            part.before_marshal()
+        PackageWriter._write_content_types_stream(self, parts)
+        PackageWriter._write_pkg_rels(self, package.rels)
+        for part in parts:
+            if part is self.document.part:
+                if len(part._rels):
+                    self.write(part.partname.rels_uri, part._rels.xml)
+            else:
+                PackageWriter._write_parts(self, [part])
+        self._zip.close()
+        if self._tmp_path is not None:
+            os.replace(self._tmp_path, self.target)
+        self.closed = True
+
+    def abort(self):
+        """放弃写出：关闭 zip，输出到文件路径时删除临时文件，目标文件保持原样；流由调用者处理"""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self._entry.close()
+            self._zip.close()
+        except Exception:  # 已损坏的输出不再需要，关闭失败也只需释放文件
+            fp = getattr(self._zip, "fp", None)
+            if fp is not None and self._tmp_path is not None:
+                fp.close()
+        if self._tmp_path is not None:
+            try:
+                os.unlink(self._tmp_path)
+            except OSError:
+                pass
+
+    def write(self, pack_uri, blob: bytes):
+        """供 PackageWriter 写出普通部分"""
+        self._zip.writestr(pack_uri.membername, blob)
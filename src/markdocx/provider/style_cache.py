@@ -0,0 +1,164 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from docx import Document
+from docx.oxml import parse_xml
+
+from ..provider.style_manager import StyleManager
+
+# markdocx compile-style 生成的预编译样式文件
+COMPILED_SUFFIX = ".mdxs"
+_COMPILED_FORMAT = "markdocx-style"
+_COMPILED_VERSION = 1
+
+_CACHE_SIZE = 32
+_cache = OrderedDict()  # 进程内共用：缓存键 -> CompiledStyle
+_lock = threading.Lock()
+
+
+class CompiledStyle:
+    """
+    编译好的样式
+
+    StyleManager.init_styles 要通过 python-docx 的代理对象逐项修改样式 XML，开销不小。
+    这里对每份样式配置只执行一次，保存解析后的配置和生成的 styles.xml，
+    之后新建文档时直接替换其样式部分，或从已注入样式的空白文档深拷贝一份。
+    """
+
+    def __init__(self, style_conf: dict, styles_xml: bytes = None):
+        self.style_conf = style_conf
+        self.styles_xml = styles_xml
+        self._document = None  # 已注入样式的空白文档，第一次 new_document 时创建
+        self._document_lock = threading.Lock()
+        self._fingerprint = None
+
+    @property
+    def fingerprint(self) -> str:
+        """样式配置和 styles.xml 的哈希，内容相同的样式得到相同的值"""
+        if self._fingerprint is None:
+            content = json.dumps(self.style_conf, sort_keys=True, ensure_ascii=False, default=str)
+            digest = hashlib.sha256(content.encode("utf-8"))
+            digest.update(self.styles_xml or b"")
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    @classmethod
+    def compile(cls, style_conf: dict = None):
+        """应用样式配置，生成 styles.xml；style_conf 为 None 时使用 python-docx 的默认样式"""
+        if style_conf is None:
+            return cls({})
+        # StyleManager 会把默认的标题样式合并进配置，不修改调用者的字典
+        style_conf = copy.deepcopy(style_conf)
+        document = Document()
+        StyleManager(document, style_conf).init_styles()
+        return cls(style_conf, document.part._styles_part.blob)
+
+    def apply(self, document):
+        """把样式注入新建的文档"""
+        if self.styles_xml is not None:
+            document.part._styles_part._element = parse_xml(self.styles_xml)
+        return document
+
+    def save(self, path):
+        """保存为预编译样式文件（JSON），加载时不需要解析 YAML"""
+        data = {
+            "format": _COMPILED_FORMAT,
+            "version": _COMPILED_VERSION,
+            "style": self.style_conf,
+            "styles_xml": self.styles_xml.decode("utf-8") if self.styles_xml is not None else None,
+        }
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(data, file, ensure_ascii=False, default=str)
+
+    @classmethod
+    def load(cls, path):
+        """读取 save 生成的预编译样式文件"""
+        with open(path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        if data.get("format") != _COMPILED_FORMAT or data.get("version") != _COMPILED_VERSION:
+            raise ValueError("%s is not a compiled style of this version, "
+                             "recompile it with `markdocx compile-style`" % path)
+        styles_xml = data["styles_xml"]
+        return cls(data["style"], styles_xml.encode("utf-8") if styles_xml is not None else None)
+
+    def __getstate__(self):
+        # 传给批量转换的工作进程时，只传配置和 styles.xml
+        return {"style_conf": self.style_conf, "styles_xml": self.styles_xml}
+
+    def __setstate__(self, state):
+        self.__init__(state["style_conf"], state["styles_xml"])
+
+    def new_document(self):
+        """返回一份已应用样式的新文档，比 Document() 加注入样式更快"""
+        if self._document is None:
+            with self._document_lock:
+                if self._document is None:
+                    self._document = self.apply(Document())
+        return copy.deepcopy(self._document)
+
+
+def resolve_style(style_config=None) -> CompiledStyle:
+    """
+    按 MarkDocx 的 style_config 参数取得编译好的样式
+
+    Args:
+        style_config: YAML / .mdxs 文件路径、字典或 CompiledStyle，为空时使用内置的默认样式
+    """
+    if not style_config:
+        return load_style(os.path.join(os.path.dirname(os.path.dirname(__file__)), "config", "default_style.yaml"))
+    if isinstance(style_config, (str, os.PathLike)):
+        return load_style(style_config)
+    if isinstance(style_config, dict):
+        return compile_style(style_config)
+    if isinstance(style_config, CompiledStyle):
+        return style_config
+    raise ValueError("style_config must be a file path or dictionary")
+
+
+def compile_style(style_conf: dict = None) -> CompiledStyle:
+    """按配置内容的哈希缓存编译结果"""
+    content = json.dumps(style_conf, sort_keys=True, ensure_ascii=False, default=str)
+    key = ("conf", hashlib.sha256(content.encode("utf-8")).hexdigest())
+    return _cached(key, lambda: CompiledStyle.compile(style_conf))
+
+
+def load_style(path) -> CompiledStyle:
+    """
+    读取样式文件，按 路径 + 修改时间 缓存，文件修改后自动重新读取
+
+    .mdxs 预编译样式直接加载；其他文件按 YAML 解析后编译。
+    """
+    key = ("path",) + _file_key(path)
+    if str(path).endswith(COMPILED_SUFFIX):
+        return _cached(key, lambda: CompiledStyle.load(path))
+
+    from ..utils.yaml_utils import read_style_yaml  # 只有 YAML 样式才需要 PyYAML
+    return _cached(key, lambda: compile_style(read_style_yaml(path)))
+
+
+def _file_key(path: str) -> tuple:
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+
+
+def _cached(key, build) -> CompiledStyle:
+    with _lock:
+        compiled = _cache.get(key)
+        if compiled is not None:
+            _cache.move_to_end(key)
+            return compiled
+    compiled = build()
+    with _lock:
+        _cache[key] = compiled
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return compiled
+
+
+def clear_style_cache():
+    with _lock:
+        _cache.clear()
@@ -1,3 +1,5 @@
+import logging
+
 import docx
 from docx import Document
 from docx.oxml.ns import qn
@@ -9,6 +11,8 @@ from docx.styles.styles import Styles
 from .simple_style import SimpleStyle
 from ..utils.style_enum import MDX_STYLE
 
+logger = logging.getLogger(__name__)
+
 
 class StyleManager:
 
@@ -95,7 +99,7 @@ class StyleManager:
                 int(_style.font_color[4:6], 16)
             )
         except ValueError:
-            print("[STYLE ERROR]: Invalid color format for", _style.style_name)
+            logger.warning("Invalid color format for %s", _style.style_name)
 
         # 设置字体附加属性
         font.bold = _style.font_bold
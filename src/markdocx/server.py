@@ -0,0 +1,271 @@
+"""
+常驻转换服务：markdocx serve
+
+命令行每次调用都要启动解释器、导入依赖、加载样式，编辑器里每次导出都要付出几百毫秒。
+服务启动时编译好所有样式并预热工作进程（每个进程各自持有 MarkDocx 转换器和图片缓存），
+之后通过本地 HTTP 端口或 Unix socket 接收 Markdown，直接返回 .docx 的 bytes：
+
+    POST /convert?style=<样式 id>[&base_dir=<图片目录>]   请求体为 UTF-8 编码的 Markdown
+    GET  /health                                          服务状态（JSON）
+
+相对路径的图片在启动时指定的图片根目录（image_root）中查找；请求中的 base_dir 是根目录下的子目录，
+不能指向根目录之外，未指定根目录时不接受 base_dir。
+"""
+import json
+import os
+import socketserver
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_STYLE = "default"
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+# 每个工作进程各自持有的转换器 {样式 id: MarkDocx}，只在进程启动时创建一次
+_worker_converters = None
+
+
+class ServerBusy(Exception):
+    """正在处理和排队的请求数已达上限"""
+
+
+class ForbiddenPath(Exception):
+    """请求的 base_dir 不在图片根目录之内"""
+
+
+def _init_worker(styles, options):
+    global _worker_converters
+    from .converter import MarkDocx
+    _worker_converters = {style_id: MarkDocx(style_config=compiled, **options)
+                          for style_id, compiled in styles.items()}
+    # 先转换一次，完成模板文档、Markdown 解析器等的延迟初始化
+    for converter in _worker_converters.values():
+        converter.convert_string("# markdocx\n\nwarm up")
+
+
+def _convert_in_worker(style_id: str, markdown_string: str, base_dir: str = None) -> bytes:
+    return _worker_converters[style_id].convert_string(markdown_string, base_dir=base_dir)
+
+
+def _warm_up() -> int:
+    return os.getpid()
+
+
+class ConversionService:
+    """
+    转换服务的核心，与传输方式无关
+
+    - styles 中的样式在启动时编译一次，再交给各工作进程；
+    - workers 为 1 时在当前进程的一个线程中转换，否则使用预热好的进程池；
+    - 同时处理和排队的请求最多 workers + max_queue 个，超出时立即抛出 ServerBusy，而不是无限排队。
+    """
+
+    def __init__(self, styles: dict = None, workers: int = None, max_queue: int = 16, options: dict = None,
+                 image_root: str = None):
+        """
+        Args:
+            styles: {样式 id: YAML / .mdxs 路径、字典或 CompiledStyle}，未包含 "default" 时使用内置样式
+            workers: 工作进程数，默认为 CPU 核数
+            max_queue: 等待中的请求数上限
+            options: 创建 MarkDocx 时的其他参数，如 image_cache
+            image_root: 图片根目录，相对路径的图片在其中查找，请求的 base_dir 不能超出该目录
+        """
+        from .provider.style_cache import resolve_style
+
+        styles = dict(styles or {})
+        styles.setdefault(DEFAULT_STYLE, None)
+        # 在主进程中编译一次，样式文件有错时启动即失败
+        compiled = {style_id: resolve_style(style) for style_id, style in styles.items()}
+
+        self.styles = compiled
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.options = options or {}
+        self.image_root = os.path.realpath(image_root) if image_root else None
+        self._slots = threading.BoundedSemaphore(self.workers + max_queue)
+        self._pending = 0
+        self._lock = threading.Lock()
+
+        initargs = (self.styles, self.options)
+        if self.workers == 1:
+            self.executor = ThreadPoolExecutor(max_workers=1, initializer=_init_worker, initargs=initargs)
+        else:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                initargs=initargs)
+        # 预先启动所有工作进程，第一个请求不用等待进程启动和样式加载
+        for future in [self.executor.submit(_warm_up) for _ in range(self.workers)]:
+            future.result()
+
+    @property
+    def pending(self) -> int:
+        """正在处理和排队的请求数"""
+        return self._pending
+
+    def resolve_base_dir(self, base_dir: str = None):
+        """
+        把请求中的 base_dir 解析为图片根目录下的绝对路径，未指定时使用根目录本身
+
+        base_dir 来自客户端，先 realpath 展开 ".." 和符号链接，再检查是否仍在根目录之内，
+        否则任何客户端都能让服务读取 /etc 等目录中的文件并写入生成的文档。
+
+        Raises:
+            ForbiddenPath: 未配置图片根目录，或 base_dir 在根目录之外
+        """
+        if self.image_root is None:
+            if base_dir:
+                raise ForbiddenPath("base_dir is not accepted: the server has no image root")
+            return None
+        path = os.path.realpath(os.path.join(self.image_root, base_dir or ""))
+        if os.path.commonpath([path, self.image_root]) != self.image_root:
+            raise ForbiddenPath("base_dir is outside the image root: %s" % base_dir)
+        return path
+
+    def convert(self, markdown_string: str, style: str = DEFAULT_STYLE, base_dir: str = None) -> bytes:
+        """
+        转换 Markdown 并返回 .docx 的 bytes
+
+        Raises:
+            KeyError: 未知的样式 id
+            ForbiddenPath: base_dir 不在图片根目录之内
+            ServerBusy: 请求数已达上限
+        """
+        if style not in self.styles:
+            raise KeyError(style)
+        base_dir = self.resolve_base_dir(base_dir)
+        if not self._slots.acquire(blocking=False):
+            raise ServerBusy("too many pending requests (limit %d)" % (self.workers + self.max_queue))
+        with self._lock:
+            self._pending += 1
+        try:
+            return self.executor.submit(_convert_in_worker, style, markdown_string, base_dir).result()
+        finally:
+            with self._lock:
+                self._pending -= 1
+            self._slots.release()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+
+class ConversionRequestHandler(BaseHTTPRequestHandler):
+    server_version = "markdocx"
+
+    @property
+    def service(self) -> ConversionService:
+        return self.server.service
+
+    def do_GET(self):
+        if urlparse(self.path).path != "/health":
+            self._send_error(404, "not found")
+            return
+        status = {
+            "status": "ok",
+            "styles": sorted(self.service.styles),
+            "workers": self.service.workers,
+            "pending": self.service.pending,
+        }
+        self._send(200, "application/json", json.dumps(status).encode("utf-8"))
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/convert":
+            self._send_error(404, "not found")
+            return
+        query = parse_qs(url.query)
+        style = query.get("style", [DEFAULT_STYLE])[0]
+        base_dir = query.get("base_dir", [None])[0]
+
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:  # 负数会让 rfile.read 一直读到客户端断开
+            self._send_error(400, "invalid Content-Length")
+            return
+        if length > self.server.max_body:
+            self._send_error(413, "request body exceeds %d bytes" % self.server.max_body)
+            return
+        try:
+            markdown_string = self.rfile.read(length).decode("utf-8")
+        except UnicodeDecodeError:
+            self._send_error(400, "request body must be UTF-8 encoded Markdown")
+            return
+
+        try:
+            data = self.service.convert(markdown_string, style=style, base_dir=base_dir)
+        except KeyError:
+            self._send_error(400, "unknown style: %s" % style)
+        except ForbiddenPath as e:
+            self._send_error(403, str(e))
+        except ServerBusy as e:
+            self._send_error(503, str(e), {"Retry-After": "1"})
+        except Exception as e:
+            self._send_error(500, "%s: %s" % (type(e).__name__, e))
+        else:
+            self._send(200, DOCX_MIME, data)
+
+    def _send(self, code: int, content_type: str, body: bytes, headers: dict = None):
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, code: int, message: str, headers: dict = None):
+        self._send(code, "text/plain; charset=utf-8", message.encode("utf-8"), headers)
+
+    def address_string(self) -> str:
+        # Unix socket 的客户端地址是空字符串
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class ConversionHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    max_body = 16 * 1024 * 1024  # 请求体上限（字节）
+    verbose = False  # 是否输出每个请求的访问日志
+
+    def __init__(self, address, service: ConversionService):
+        self.service = service
+        super().__init__(address, ConversionRequestHandler)
+
+
+if hasattr(socketserver, "UnixStreamServer"):  # Windows 上没有 Unix socket
+    class ConversionUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+        max_body = ConversionHTTPServer.max_body
+        verbose = False
+
+        def __init__(self, path: str, service: ConversionService):
+            self.service = service
+            if os.path.exists(path):
+                os.unlink(path)  # 上次未正常退出时残留的 socket 文件
+            super().__init__(path, ConversionRequestHandler)
+
+        def server_close(self):
+            super().server_close()
+            try:
+                os.unlink(self.server_address)
+            except OSError:
+                pass
+
+
+def make_server(service: ConversionService, host: str = "127.0.0.1", port: int = 8765, socket_path: str = None,
+                max_body: int = None, verbose: bool = False):
+    """创建服务器，指定 socket_path 时监听 Unix socket，否则监听 host:port"""
+    if socket_path:
+        if not hasattr(socketserver, "UnixStreamServer"):
+            raise OSError("Unix sockets are not supported on this platform")
+        server = ConversionUnixServer(socket_path, service)
+    else:
+        server = ConversionHTTPServer((host, port), service)
+    if max_body:
+        server.max_body = max_body
+    server.verbose = verbose
+    return server
@@ -0,0 +1,103 @@
+"""
+转换过程的统计：各阶段耗时、各类元素的数量和渲染耗时、输入输出大小
+
+MarkDocx 每次转换都会生成一个 ConversionStats（也可以由调用者通过 stats 参数传入），
+转换完成后传给 on_stats 回调，命令行的 --profile 以 JSON 输出。
+"""
+import functools
+import json
+import time
+from contextlib import contextmanager
+
+# 各阶段的名称，按转换的先后顺序；cache 为查找结果缓存的耗时
+STAGES = ("read", "parse", "cache", "images", "render", "save")
+
+
+class ConversionStats:
+    """
+    一次转换的统计结果
+
+    - stages: {阶段: 秒}，见 STAGES，未经过的阶段不出现
+    - elements: {元素类型: {"count": 次数, "seconds": 秒}}，秒数不含其中嵌套的其他元素（如段落中的超链接）
+    - blocks: 顶层块数；remote_images: 下载的网络图片数
+    - markdown_bytes / bytes_written: 输入的 Markdown 和输出的 .docx 字节数
+    - cache_hit: 是否直接返回了结果缓存中的文档
+    - diagnostics: 转换中产生的警告（WARNING 及以上的日志），见 markdocx.diagnostics
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.elements = {}
+        self.blocks = 0
+        self.remote_images = 0
+        self.markdown_bytes = 0
+        self.bytes_written = 0
+        self.cache_hit = False
+        self.diagnostics = []
+        self._stack = []  # 正在渲染的元素 [名称, 开始时间, 嵌套元素的耗时]
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(self.stages.values())
+
+    @contextmanager
+    def stage(self, name: str):
+        """统计一个阶段的耗时，同名阶段多次进入时累加"""
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def enter(self, element: str):
+        self._stack.append([element, time.perf_counter(), 0.0])
+
+    def exit(self):
+        element, start, nested = self._stack.pop()
+        elapsed = time.perf_counter() - start
+        entry = self.elements.get(element)
+        if entry is None:
+            entry = self.elements[element] = {"count": 0, "seconds": 0.0}
+        entry["count"] += 1
+        entry["seconds"] += elapsed - nested
+        if self._stack:
+            self._stack[-1][2] += elapsed
+
+    def to_dict(self) -> dict:
+        return {
+            "total_seconds": self.total_seconds,
+            "stages": {name: self.stages[name] for name in STAGES if name in self.stages},
+            "elements": {name: dict(entry) for name, entry in sorted(self.elements.items())},
+            "blocks": self.blocks,
+            "remote_images": self.remote_images,
+            "markdown_bytes": self.markdown_bytes,
+            "bytes_written": self.bytes_written,
+            "cache_hit": self.cache_hit,
+            "diagnostics": list(self.diagnostics),
+        }
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def __repr__(self):
+        stages = ", ".join("%s=%.4fs" % (name, seconds) for name, seconds in self.to_dict()["stages"].items())
+        return "<ConversionStats %s, %d bytes written>" % (stages, self.bytes_written)
+
+
+def timed(element: str):
+    """
+    DocxProcessor 渲染方法的装饰器：processor.stats 不为空时统计该类元素的数量和耗时
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            stats = self.stats
+            if stats is None:
+                return method(self, *args, **kwargs)
+            stats.enter(element)
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                stats.exit()
+        return wrapper
+    return decorator
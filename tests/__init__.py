@@ -7,6 +7,9 @@ import pytest
 from pathlib import Path
 import tempfile
 import shutil
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 # 测试资源目录
 TEST_RESOURCES = Path(__file__).parent / "resources"
@@ -27,6 +30,60 @@ def cleanup_temp_file(path: Path):
     if path.exists():
         path.unlink()
 
+class LocalImageServer:
+    """
+    本地 HTTP 服务，代替网络图片进行离线测试
+
+    /<name> 返回 tests/resources/test.png，每次请求可附加固定延迟，并记录请求路径。
+    响应带有 ETag，请求带上匹配的 If-None-Match 时返回 304。
+    """
+    etag = '"test-png-v1"'
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.requests = []
+        self.not_modified = 0
+        self.image = get_test_file("test.png").read_bytes()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append(self.path)
+                if server.delay:
+                    time.sleep(server.delay)
+                if self.path.startswith("/missing"):
+                    self.send_error(404)
+                    return
+                if self.headers.get("If-None-Match") == server.etag:
+                    server.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", server.etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("ETag", server.etag)
+                self.send_header("Content-Type", "image/png")
+                self.send_header("Content-Length", str(len(server.image)))
+                self.end_headers()
+                self.wfile.write(server.image)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def url(self, path: str) -> str:
+        return "http://127.0.0.1:%d/%s" % (self.httpd.server_address[1], path.lstrip("/"))
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
 @pytest.fixture(scope="session", autouse=True)
 def setup_test_resources():
     """设置测试资源目录"""
@@ -0,0 +1,75 @@
+import shutil
+import pytest
+from docx import Document
+from markdocx import MarkDocx
+from markdocx.batch import convert_many, expand_inputs
+from markdocx.cli import main
+from . import get_test_file
+
+
+@pytest.fixture
+def batch_dir(tmp_path):
+    """准备批量转换的输入目录：两个正常文件和一个引用了不存在图片的文件"""
+    src = tmp_path / "in"
+    (src / "sub").mkdir(parents=True)
+    shutil.copy(get_test_file("test.png"), src / "test.png")
+    (src / "one.md").write_text("# One\n\n![Pic](test.png)\n", encoding="utf-8")
+    (src / "sub" / "two.md").write_text("# Two\n\n- a\n- b\n", encoding="utf-8")
+    (src / "bad.md").write_text("![Missing](missing.png)\n", encoding="utf-8")
+    return src
+
+
+def test_expand_inputs(batch_dir):
+    """测试输入展开：目录递归并保留相对路径，glob 与文件去重"""
+    files = expand_inputs([batch_dir, str(batch_dir / "*.md"), batch_dir / "one.md"])
+    relatives = sorted(str(relative) for _, relative in files)
+    assert relatives == ["bad.md", "one.md", "sub/two.md"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_convert_many(batch_dir, tmp_path, workers):
+    """测试批量转换：单个文件失败不影响其他文件"""
+    out_dir = tmp_path / "out"
+    results = list(MarkDocx().convert_many([batch_dir], out_dir, workers=workers))
+
+    assert len(results) == 3
+    failed = [r for r in results if not r.ok]
+    assert [r.input.name for r in failed] == ["bad.md"]
+    assert "missing.png" in failed[0].error
+
+    assert (out_dir / "one.docx").exists()
+    doc = Document(out_dir / "sub" / "two.docx")
+    assert doc.paragraphs[0].text == "Two"
+
+
+def test_cli_batch_mode(batch_dir, tmp_path, capsys):
+    """测试命令行批量模式的输出和返回码"""
+    out_dir = tmp_path / "cli_out"
+    code = main([str(batch_dir / "**" / "*.md"), "-o", str(out_dir), "--jobs", "2"])
+    output = capsys.readouterr().out
+
+    assert code == 1
+    assert "[FAILED]" in output and "bad.md" in output
+    assert "2 converted, 1 failed" in output
+    # glob 保留相对于 ** 之前的目录的结构
+    assert (out_dir / "sub" / "two.docx").exists()
+
+
+def test_inputs_with_same_name_do_not_collide(tmp_path, capsys):
+    """测试不同目录下的同名文件输出到各自的子目录，仍然冲突时在转换前报错"""
+    for name in ("a", "b"):
+        (tmp_path / "docs" / name).mkdir(parents=True)
+        (tmp_path / "docs" / name / "README.md").write_text("# %s\n" % name, encoding="utf-8")
+    out_dir = tmp_path / "out"
+
+    assert main([str(tmp_path / "docs" / "**" / "*.md"), "-o", str(out_dir), "--jobs", "2"]) == 0
+    assert Document(out_dir / "a" / "README.docx").paragraphs[0].text == "a"
+    assert Document(out_dir / "b" / "README.docx").paragraphs[0].text == "b"
+
+    files = [tmp_path / "docs" / "a" / "README.md", tmp_path / "docs" / "b" / "README.md"]
+    with pytest.raises(ValueError, match="same output"):
+        convert_many(files, tmp_path / "flat")
+    capsys.readouterr()
+    assert main([str(path) for path in files] + ["-o", str(tmp_path / "flat")]) == 1
+    assert "same output" in capsys.readouterr().out
+    assert not (tmp_path / "flat").exists()
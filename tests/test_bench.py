@@ -0,0 +1,22 @@
+import json
+
+from markdocx import cli
+from markdocx.bench import SCENARIOS, STAGES, run_bench
+
+
+def test_bench_runs_every_scenario():
+    """测试基准测试的每个场景都能转换成功，并给出各阶段的耗时和内存"""
+    results = run_bench(scale=0.002, rounds=1)
+    assert [result.name for result in results] == list(SCENARIOS)
+    for result in results:
+        assert result.docx_bytes > 0
+        assert set(result.stages) == set(STAGES)
+        assert all(stage.seconds > 0 and stage.peak_bytes >= 0 for stage in result.stages.values())
+
+
+def test_bench_command_json(capsys):
+    """测试 markdocx bench --json 输出可解析的结果"""
+    assert cli.main(["bench", "tables", "--scale", "0.01", "-n", "1", "--json"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert [result["name"] for result in report["results"]] == ["tables"]
+    assert report["results"][0]["size"] == 50
@@ -0,0 +1,56 @@
+import logging
+import shutil
+
+from markdocx import ConversionStats, MarkDocx
+from markdocx.batch import convert_many
+from . import LocalImageServer, get_test_file
+
+
+def test_warnings_collected_per_document(capsys):
+    """测试图片下载失败等警告记入本次转换的诊断信息，不输出到标准输出"""
+    converter = MarkDocx()
+    stats = ConversionStats()
+    with LocalImageServer() as server:
+        converter.convert_string("![Missing](%s)\n\n![Ok](%s)\n" % (server.url("missing.png"), server.url("ok.png")),
+                                 stats=stats)
+
+    diagnostics = stats.diagnostics
+    assert len(diagnostics) == 1
+    assert diagnostics[0].startswith("WARNING:") and "missing.png" in diagnostics[0]
+    assert capsys.readouterr().out == ""
+
+    stats = ConversionStats()
+    converter.convert_string("# 没有警告\n", stats=stats)
+    assert stats.diagnostics == []
+
+
+def test_debug_logging_is_lazy(caplog):
+    """测试 DEBUG 未启用时不产生日志记录，启用后记录每个行内元素"""
+    with caplog.at_level(logging.INFO, logger="markdocx"):
+        MarkDocx().convert_string("**bold** text\n")
+    assert not [r for r in caplog.records if r.levelno == logging.DEBUG]
+
+    with caplog.at_level(logging.DEBUG, logger="markdocx"):
+        MarkDocx().convert_string("**bold** text\n")
+    assert any(r.getMessage() == "[bold]: bold" for r in caplog.records)
+
+
+def test_batch_results_carry_diagnostics(tmp_path):
+    """测试批量转换时每个文件的警告保存在各自的 BatchResult 中"""
+    shutil.copy(get_test_file("test.png"), tmp_path / "test.png")
+    with LocalImageServer() as server:
+        (tmp_path / "warn.md").write_text("![Missing](%s)\n" % server.url("missing.png"), encoding="utf-8")
+        (tmp_path / "ok.md").write_text("# Ok\n\n![Pic](test.png)\n", encoding="utf-8")
+        # 先产生警告、再因本地图片不存在而失败
+        (tmp_path / "bad.md").write_text("![Missing](%s)\n\n![Local](local.png)\n" % server.url("missing.png"),
+                                         encoding="utf-8")
+        results = {r.input.name: r for r in convert_many([tmp_path], tmp_path / "out", workers=2)}
+
+    assert results["warn.md"].ok and results["ok.md"].ok
+    assert len(results["warn.md"].diagnostics) == 1
+    assert results["ok.md"].diagnostics == ()
+    # 失败的文件同样带回出错前的警告和统计
+    bad = results["bad.md"]
+    assert not bad.ok and "local.png" in bad.error
+    assert len(bad.diagnostics) == 1 and "missing.png" in bad.diagnostics[0]
+    assert bad.stats["remote_images"] == 1 and "parse" in bad.stats["stages"]
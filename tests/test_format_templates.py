@@ -0,0 +1,38 @@
+from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+from docx.shared import Pt
+
+from markdocx.provider.docx_processor import DocxProcessor
+from markdocx.utils.style_enum import MDX_STYLE
+
+
+def test_paragraph_templates_match_python_docx():
+    """测试复制 w:pPr / w:rPr 模板生成的段落与逐个属性设置的 python-docx 结果完全一致"""
+    expected = DocxProcessor().document
+    p = expected.add_paragraph(style=MDX_STYLE.PLAIN_TEXT)
+    p.add_run("code\n  block").font.name = "Consolas"
+    p.paragraph_format.first_line_indent = 0
+    p.paragraph_format.left_indent = Pt(20)
+    p.paragraph_format.space_before = Pt(10)
+    p.paragraph_format.space_after = Pt(10)
+    p = expected.add_paragraph(" caption", style=MDX_STYLE.CAPTION)
+    p.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+    p.paragraph_format.first_line_indent = 0
+    expected.add_paragraph("item", style=MDX_STYLE.LIST_BULLET)
+    expected.add_paragraph("plain")
+
+    paragraphs = DocxProcessor().paragraphs
+    paragraphs.add_paragraph("code\n  block", style=MDX_STYLE.PLAIN_TEXT, fmt="code", formats=frozenset(("code",)))
+    paragraphs.add_paragraph(" caption", style=MDX_STYLE.CAPTION, fmt="centered")
+    paragraphs.add_paragraph("item", style=MDX_STYLE.LIST_BULLET)
+    paragraphs.add_paragraph("plain")
+
+    assert [p._p.xml for p in paragraphs.document.paragraphs] == [p._p.xml for p in expected.paragraphs]
+
+
+def test_paragraph_templates_are_built_once_per_document():
+    """测试同一种样式组合只构造一次模板，模板不在文档间共用"""
+    processor = DocxProcessor()
+    first = processor.paragraphs.ppr(MDX_STYLE.PLAIN_TEXT, "code")
+    assert processor.paragraphs.ppr(MDX_STYLE.PLAIN_TEXT, "code") is first
+    assert DocxProcessor().paragraphs.ppr(MDX_STYLE.PLAIN_TEXT, "code") is not first
+    assert processor.paragraphs.ppr() is None  # 默认样式、无段落格式时不需要 w:pPr
@@ -0,0 +1,79 @@
+import os
+import time
+from markdocx import MarkDocx
+from markdocx.provider.image_cache import ImageCache
+from markdocx.provider.image_fetcher import ImageFetcher
+from . import LocalImageServer
+
+
+def test_fresh_entry_skips_network(tmp_path):
+    """测试未过期的缓存不再发起请求，且可跨 ImageFetcher 实例（进程）共用"""
+    with LocalImageServer() as server:
+        url = server.url("logo.png")
+        first = ImageFetcher(cache=ImageCache(tmp_path)).fetch(url)
+        second = ImageFetcher(cache=ImageCache(tmp_path)).fetch(url)
+
+    assert first == second == server.image
+    assert len(server.requests) == 1
+
+
+def test_stale_entry_is_revalidated(tmp_path):
+    """测试过期的缓存用 ETag 做条件请求，304 时沿用缓存内容"""
+    cache = ImageCache(tmp_path, ttl=0)
+    with LocalImageServer() as server:
+        url = server.url("logo.png")
+        fetcher = ImageFetcher(cache=cache)
+        fetcher.fetch(url)
+        data = fetcher.fetch(url)
+
+    assert data == server.image
+    assert len(server.requests) == 2
+    assert server.not_modified == 1
+    assert cache.get(url).etag == server.etag
+
+
+def test_lru_eviction(tmp_path):
+    """测试超过容量时淘汰最久未使用的条目"""
+    cache = ImageCache(tmp_path)
+    cache.put("http://a", b"a" * 100)
+    cache.put("http://b", b"b" * 100)
+    cache.max_bytes = os.path.getsize(cache._path("http://a", ".bin")) * 5 // 2  # 只能容纳两个条目
+    # 让 a 比 b 更近被使用
+    past = time.time() - 100
+    os.utime(cache._path("http://b", ".bin"), (past, past))
+    cache.touch("http://a")
+    cache.put("http://c", b"c" * 100)
+
+    assert cache.get("http://a") is not None
+    assert cache.get("http://b") is None
+    assert cache.get("http://c") is not None
+
+
+def test_converter_uses_cache_dir(tmp_path):
+    """测试 MarkDocx 接受缓存目录，重复转换不再下载图片"""
+    with LocalImageServer() as server:
+        md = "![logo](%s)" % server.url("logo.png")
+        converter = MarkDocx(image_cache=tmp_path / "images")
+        converter.convert_string(md)
+        converter.convert_string(md)
+
+    assert len(server.requests) == 1
+
+
+def test_entry_is_a_single_file_and_stale_tmp_files_are_removed(tmp_path):
+    """测试元数据与数据写入同一个文件，淘汰时清理中断写入留下的临时文件"""
+    cache = ImageCache(tmp_path, max_bytes=1000)
+    cache.put("http://a", b"old", etag='"1"')
+    cache.put("http://a", b"new\ndata", etag='"2"')
+    entry = cache.get("http://a")
+    assert (entry.data, entry.etag) == (b"new\ndata", '"2"')
+    assert [path.suffix for path in tmp_path.iterdir()] == [".bin"]
+
+    stale = tmp_path / "interrupted.tmp"
+    stale.write_bytes(b"partial")
+    past = time.time() - 2 * 3600
+    os.utime(stale, (past, past))
+    writing = tmp_path / "writing.tmp"
+    writing.write_bytes(b"partial")
+    cache.evict()
+    assert not stale.exists() and writing.exists()
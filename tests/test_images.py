@@ -0,0 +1,132 @@
+import io
+import shutil
+import time
+import pytest
+from docx import Document
+from markdocx import MarkDocx
+from markdocx.provider.image_fetcher import ImageFetcher
+from . import LocalImageServer, get_test_file
+
+
+def _image_count(data: bytes) -> int:
+    doc = Document(io.BytesIO(data))
+    return len(doc.inline_shapes)
+
+
+def test_remote_images_are_prefetched_concurrently():
+    """测试网络图片在渲染前并发下载"""
+    with LocalImageServer(delay=0.3) as server:
+        md = "\n\n".join("![chart %d](%s)" % (i, server.url("chart%d.png" % i)) for i in range(8))
+        start = time.perf_counter()
+        data = MarkDocx(image_workers=8).convert_string(md)
+        elapsed = time.perf_counter() - start
+
+    assert _image_count(data) == 8
+    assert len(server.requests) == 8
+    # 顺序下载至少需要 8 * 0.3 秒
+    assert elapsed < 8 * 0.3
+
+
+def test_prefetch_reports_errors_per_url():
+    """测试单个图片下载失败不影响其他图片"""
+    with LocalImageServer() as server:
+        fetcher = ImageFetcher(max_workers=4)
+        results = fetcher.prefetch([server.url("a.png"), server.url("missing.png"), server.url("a.png")])
+
+    assert isinstance(results[server.url("a.png")], bytes)
+    assert isinstance(results[server.url("missing.png")], Exception)
+    # 重复的地址只下载一次
+    assert len(server.requests) == 2
+
+
+def test_repeated_images_are_embedded_once(tmp_path):
+    """测试重复的图片只嵌入一次，图形 id 仍然唯一"""
+    shutil.copy(get_test_file("test.png"), tmp_path / "logo.png")
+    shutil.copy(get_test_file("test.png"), tmp_path / "copy.png")
+    with LocalImageServer() as server:
+        md = "\n\n".join(["![logo](logo.png)"] * 10 + ["![copy](copy.png)", "![remote](%s)" % server.url("logo.png")])
+        data = MarkDocx().convert_string(md, base_dir=tmp_path)
+
+    doc = Document(io.BytesIO(data))
+    assert len(doc.inline_shapes) == 12
+    image_rels = [rel for rel in doc.part.rels.values() if "image" in rel.reltype]
+    assert len(image_rels) == 1
+    ids = doc.element.body.xpath("//wp:docPr/@id")
+    assert len(set(ids)) == len(ids) == 12
+
+
+def test_oversized_images_are_downscaled(tmp_path):
+    """测试启用图片优化后，过大的图片按显示宽度重新采样"""
+    PIL = pytest.importorskip("PIL.Image")
+    PIL.new("RGB", (3000, 2000), (30, 120, 200)).save(tmp_path / "big.png")
+    md = "![big](big.png)\n"
+    style = {"normal": {}, "image": {"optimize": True, "dpi": 100, "max-pixels": 2000}}
+
+    plain = MarkDocx().convert_string(md, base_dir=tmp_path)
+    optimized = MarkDocx(style_config=style).convert_string(md, base_dir=tmp_path)
+
+    doc = Document(io.BytesIO(optimized))
+    image = doc.inline_shapes[0]._inline.graphic.graphicData.pic
+    blob = doc.part.related_parts[image.blipFill.blip.embed].blob
+    width, height = PIL.open(io.BytesIO(blob)).size
+    # 显示宽度 5.7 英寸 × 100 dpi
+    assert width == 570 and height == 380
+    assert len(optimized) < len(plain)
+    # 显示尺寸不变
+    assert doc.inline_shapes[0].width == Document(io.BytesIO(plain)).inline_shapes[0].width
+
+
+@pytest.mark.parametrize("use_aiohttp", [True, False])
+def test_aconvert_fetches_images_concurrently(monkeypatch, use_aiohttp):
+    """测试 aconvert：网络图片在事件循环中并发下载，多个转换可以由同一个事件循环驱动"""
+    import asyncio
+    from markdocx.provider import image_fetcher
+
+    if use_aiohttp:
+        pytest.importorskip("aiohttp")
+    else:
+        monkeypatch.setattr(image_fetcher, "_import_aiohttp", lambda: None)
+
+    converter = MarkDocx(image_workers=8)
+    with LocalImageServer(delay=0.3) as server:
+        docs = ["# Doc %d\n\n" % d + "\n\n".join("![chart](%s)" % server.url("d%d-%d.png" % (d, i))
+                                                  for i in range(4)) for d in range(2)]
+
+        async def convert_all():
+            return await asyncio.gather(*(converter.aconvert(doc) for doc in docs))
+
+        start = time.perf_counter()
+        results = asyncio.run(convert_all())
+        elapsed = time.perf_counter() - start
+
+    assert [_image_count(data) for data in results] == [4, 4]
+    assert len(server.requests) == 8
+    # 顺序下载至少需要 8 * 0.3 秒
+    assert elapsed < 8 * 0.3
+
+
+def test_aconvert_keeps_blocking_work_off_the_event_loop(monkeypatch, tmp_path):
+    """测试 aconvert 中复制文档模板、读写图片磁盘缓存都不在事件循环的线程中执行"""
+    import asyncio
+    import threading
+    from markdocx.provider.image_cache import ImageCache
+
+    pytest.importorskip("aiohttp")
+    threads = []
+
+    def record(method):
+        def wrapper(*args, **kwargs):
+            threads.append((method.__name__, threading.current_thread()))
+            return method(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(ImageCache, "get", record(ImageCache.get))
+    monkeypatch.setattr(ImageCache, "put", record(ImageCache.put))
+    converter = MarkDocx(image_cache=tmp_path / "images")
+    monkeypatch.setattr(converter, "_new_processor", record(converter._new_processor))
+    with LocalImageServer() as server:
+        data = asyncio.run(converter.aconvert("![logo](%s)" % server.url("logo.png")))
+
+    assert _image_count(data) == 1
+    assert {name for name, _ in threads} == {"get", "put", "_new_processor"}
+    assert all(thread is not threading.main_thread() for _, thread in threads)
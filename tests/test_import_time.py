@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+
+# `import markdocx` 的累计耗时上限（微秒）。只导入包本身时不应加载任何第三方依赖，
+# 目前实际耗时不到 1 毫秒，这里留足余量，避免在较慢的机器上误报
+IMPORT_BUDGET_US = 50_000
+HEAVY_MODULES = ("docx", "lxml", "markdown", "yaml", "bs4", "requests", "PIL", "asyncio")
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+def _python(*args):
+    env = dict(os.environ, PYTHONPATH=SRC + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, env=env, check=True)
+
+
+def test_import_time_budget():
+    """测试 `import markdocx` 的导入耗时不超过预算"""
+    stderr = _python("-X", "importtime", "-c", "import markdocx").stderr
+    # 格式：import time: self [us] | cumulative | imported package
+    cumulative = [int(line.split("|")[1]) for line in stderr.splitlines()
+                  if line.startswith("import time:") and line.split("|")[2].strip() == "markdocx"]
+    assert cumulative, stderr
+    assert cumulative[0] < IMPORT_BUDGET_US, stderr
+
+
+def test_dependencies_load_on_first_use():
+    """测试第三方依赖在第一次用到时才导入"""
+    code = ("import sys, markdocx; "
+            "print(','.join(m for m in %r if m in sys.modules)); "
+            "markdocx.MarkDocx; "
+            "print(','.join(m for m in %r if m in sys.modules))" % (HEAVY_MODULES, HEAVY_MODULES))
+    before, after = _python("-c", code).stdout.splitlines()
+    assert before == ""
+    assert "docx" in after.split(",") and "markdown" in after.split(",")
+    # Pillow 只在样式启用 image.optimize 时才导入，asyncio 只在调用 aconvert 时才导入
+    assert "PIL" not in after.split(",") and "asyncio" not in after.split(",")
@@ -0,0 +1,74 @@
+import io
+import os
+import shutil
+import zipfile
+
+from markdocx import MarkDocx
+from markdocx.incremental import IncrementalConverter
+
+RESOURCES = os.path.join(os.path.dirname(__file__), "resources")
+
+MARKDOWN = """# 标题
+
+一段带[链接](https://example.com)的文字。
+
+![图片描述](pic.png)
+
+| A | B |
+|---|---|
+| 1 | 2 |
+
+1. 第一项
+2. 第二项
+
+- 无序
+- 列表
+"""
+
+
+def parts(data: bytes) -> dict:
+    with zipfile.ZipFile(io.BytesIO(data)) as docx_zip:
+        return {name: docx_zip.read(name) for name in docx_zip.namelist()}
+
+
+def test_incremental_matches_full_conversion(tmp_path):
+    """测试增量转换的结果与完整转换一致，且只重新渲染修改过的块"""
+    shutil.copy(os.path.join(RESOURCES, "test.png"), tmp_path / "pic.png")
+    converter = MarkDocx()
+    incremental = IncrementalConverter(converter)
+
+    data = incremental.convert_string(MARKDOWN, base_dir=tmp_path)
+    assert (incremental.rendered, incremental.reused) == (6, 0)
+    assert parts(data) == parts(converter.convert_string(MARKDOWN, base_dir=tmp_path))
+
+    edited = MARKDOWN.replace("第一项", "修改后的第一项")
+    data = incremental.convert_string(edited, base_dir=tmp_path)
+    assert (incremental.rendered, incremental.reused) == (1, 5)
+    assert parts(data) == parts(converter.convert_string(edited, base_dir=tmp_path))
+
+
+def test_incremental_rerenders_changed_local_image(tmp_path):
+    """测试 Markdown 不变、本地图片被替换时重新渲染图片所在的块"""
+    image = tmp_path / "pic.png"
+    shutil.copy(os.path.join(RESOURCES, "test.png"), image)
+    incremental = IncrementalConverter()
+    incremental.convert_string(MARKDOWN, base_dir=tmp_path)
+
+    image.write_bytes(image.read_bytes() + b"\0")
+    os.utime(image, ns=(0, 0))
+    incremental.convert_string(MARKDOWN, base_dir=tmp_path)
+    assert (incremental.rendered, incremental.reused) == (1, 5)
+
+
+def test_reused_image_block_keeps_filename(tmp_path):
+    """测试复用的图片块重新登记图片后，之后重新渲染的块中同一图片的 name 仍是原文件名，与完整转换一致"""
+    shutil.copy(os.path.join(RESOURCES, "test.png"), tmp_path / "pic.png")
+    converter = MarkDocx()
+    incremental = IncrementalConverter(converter)
+    markdown = "![图片](pic.png)\n\n段落 ![同一张图片](pic.png)\n"
+    incremental.convert_string(markdown, base_dir=tmp_path)
+
+    edited = markdown.replace("段落", "修改后的段落")
+    data = incremental.convert_string(edited, base_dir=tmp_path)
+    assert (incremental.rendered, incremental.reused) == (1, 1)
+    assert parts(data) == parts(converter.convert_string(edited, base_dir=tmp_path))
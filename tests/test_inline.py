@@ -0,0 +1,46 @@
+import io
+
+from docx import Document
+from docx.oxml.ns import qn
+
+from markdocx import MarkDocx
+
+
+def paragraph(markdown: str):
+    return Document(io.BytesIO(MarkDocx().convert_string(markdown))).paragraphs[0]
+
+
+def test_adjacent_runs_with_same_format_are_merged():
+    """测试格式相同的相邻文本合并为一个 run，未设置格式的 run 不带 w:rPr"""
+    p = paragraph("Plain and <span>span</span> **bold** tail\n")
+    assert [(run.text, bool(run.bold)) for run in p.runs] == \
+           [("Plain and span ", False), ("bold", True), (" tail", False)]
+    assert [r.find(qn("w:rPr")) is not None for r in p._p.r_lst] == [False, True, False]
+
+
+def test_hyperlink_splits_runs():
+    """测试超链接前后的文本保持原来的顺序"""
+    p = paragraph("before [link](https://example.com) after\n")
+    assert p._p.xpath("string(.)") == "before link after"
+    assert p._p.xpath("./w:hyperlink")[0].find(qn("w:r")).find(qn("w:rPr")) is None
+
+
+def test_nested_inline_formats():
+    """测试嵌套的行内样式叠加在一起，而不是被忽略"""
+    p = paragraph("<u>**又加粗又*斜体*又下划线**</u>，`code` 与 **[链接](https://example.com)**\n")
+    runs = [(run.text, run.bold, run.italic, run.underline) for run in p.runs]
+    assert runs[:3] == [("又加粗又", True, None, True), ("斜体", True, True, True), ("又下划线", True, None, True)]
+    assert p.runs[4].text == "code" and p.runs[4].font.name == "Consolas"
+    link_run = p._p.xpath("./w:hyperlink/w:r")[0]
+    assert link_run.text == "链接" and link_run.rPr.b is not None
+
+
+def test_hard_line_break_renders_once():
+    """测试 Markdown 的硬换行（行尾两个空格）和 HTML 的 <br> 都只产生一个换行"""
+    p = paragraph("Line one  \nline two\n")
+    assert p.text == "Line one\nline two"
+    assert len(p._p.xpath(".//w:br")) == 1
+
+    p = paragraph("a<br>b\n")
+    assert p.text == "a\nb"
+    assert len(p._p.xpath(".//w:br")) == 1
@@ -1,3 +1,6 @@
+import io
+import os
+import shutil
 import pytest
 from pathlib import Path
 from docx import Document
@@ -168,5 +171,110 @@ print("Hello from doc {i+1}")
         for file in test_files + output_files:
             cleanup_temp_file(file)
 
+def test_in_memory_conversion(tmp_path, monkeypatch):
+    """测试内存中的转换：字符串或流输入，bytes 输出，不产生中间文件"""
+    test_md = get_test_file("test.md")
+    monkeypatch.chdir(tmp_path)
+
+    converter = MarkDocx()
+    with open(test_md, "rb") as stream:
+        data = converter.to_bytes(stream, base_dir=test_md.parent)
+
+    # 工作目录和输入目录中都不应出现 temp.md 或 .html 中间文件
+    assert list(tmp_path.iterdir()) == []
+    assert not test_md.with_suffix(".html").exists()
+
+    doc = Document(io.BytesIO(data))
+    headings = [p for p in doc.paragraphs if p.style.name.startswith('Heading')]
+    assert headings[0].text.strip() == "Test Document"
+
+    data = MarkDocx().convert_string("# In Memory\n\nHello", base_dir=tmp_path)
+    assert isinstance(data, bytes)
+    doc = Document(io.BytesIO(data))
+    assert doc.paragraphs[0].text == "In Memory"
+    assert list(tmp_path.iterdir()) == []
+
+def test_threaded_conversion_keeps_cwd(tmp_path):
+    """测试多线程转换：相对路径图片按各自目录解析，且不修改进程工作目录"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    sources = []
+    for i in range(4):
+        doc_dir = tmp_path / f"doc{i}"
+        (doc_dir / "img").mkdir(parents=True)
+        shutil.copy(get_test_file("test.png"), doc_dir / "img" / "pic.png")
+        md_file = doc_dir / "doc.md"
+        md_file.write_text(f"# Doc {i}\n\n![Pic](img/pic.png)\n", encoding="utf-8")
+        sources.append(md_file)
+
+    cwd = os.getcwd()
+    converter = MarkDocx()
+
+    def convert(md_file):
+        return converter.convert(str(md_file), str(md_file.with_suffix(".docx")))
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(convert, sources))
+
+    assert os.getcwd() == cwd
+    for result in results:
+        doc = Document(result)
+        assert any("image" in rel.reltype for rel in doc.part.rels.values())
+
+def test_repeated_conversion_uses_fresh_document():
+    """测试同一个转换器多次转换：每次都是新文档，内容不会累积"""
+    converter = MarkDocx()
+    first = Document(io.BytesIO(converter.convert_string("# First\n\nOne")))
+    second = Document(io.BytesIO(converter.convert_string("# Second\n\nTwo")))
+
+    assert [p.text for p in first.paragraphs] == ["First", "One"]
+    assert [p.text for p in second.paragraphs] == ["Second", "Two"]
+    # 样式来自同一份模板
+    assert second.styles['Heading1'].font.size == first.styles['Heading1'].font.size
+
+def test_streaming_output_matches_normal_output(tmp_path):
+    """测试流式输出：逐块写出的 .docx 与普通保存的完全一致，且写出后的块已从内存中释放"""
+    import zipfile
+    from markdocx.parser.md_parser import md2tree
+    from markdocx.provider.docx_processor import DocxProcessor
+
+    test_md = get_test_file("test.md")
+    normal = MarkDocx().convert(str(test_md), str(tmp_path / "normal.docx"))
+    streamed = MarkDocx(streaming=True).convert(str(test_md), str(tmp_path / "streamed.docx"))
+
+    with zipfile.ZipFile(normal) as a, zipfile.ZipFile(streamed) as b:
+        assert sorted(a.namelist()) == sorted(b.namelist())
+        for name in a.namelist():
+            assert a.read(name) == b.read(name), name
+
+    stream = io.BytesIO()
+    processor = DocxProcessor().stream_to(stream)
+    processor.render_tree(md2tree("# Title\n\nHello\n\n- a\n- b\n"))
+    # body 中只剩 sectPr
+    assert len(processor.document.element.body) == 1
+    processor.save()
+    doc = Document(io.BytesIO(stream.getvalue()))
+    assert [p.text for p in doc.paragraphs] == ["Title", "Hello", "a", "b"]
+
+def test_streaming_failure_leaves_no_partial_file(tmp_path, monkeypatch):
+    """测试流式输出中途出错时不留下不完整的 .docx，已存在的输出文件保持原样"""
+    from markdocx.provider.docx_processor import DocxProcessor
+
+    def fail(self, table_root):
+        raise RuntimeError("broken block")
+
+    monkeypatch.setattr(DocxProcessor, "add_table", fail)
+    output = tmp_path / "out.docx"
+    with pytest.raises(RuntimeError):
+        MarkDocx(streaming=True).convert_string("# Title\n\n| a |\n|---|\n| b |\n", str(output))
+    assert list(tmp_path.iterdir()) == []
+
+    output.write_bytes(b"previous")
+    with pytest.raises(RuntimeError):
+        MarkDocx(streaming=True).convert_string("| a |\n|---|\n| b |\n", str(output))
+    assert [path.name for path in tmp_path.iterdir()] == ["out.docx"]
+    assert output.read_bytes() == b"previous"
+
+
 if __name__ == "__main__":
     pytest.main([__file__]) 
\ No newline at end of file
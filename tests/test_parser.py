@@ -0,0 +1,68 @@
+import pytest
+from bs4 import BeautifulSoup
+from markdocx.parser.md_parser import md2html_str, md2tree
+from . import get_test_file
+
+TRICKY_MD = """Intro with `a < b && c &amp; d` and AT&T &copy; text.
+
+Auto <https://example.com/?a=1&b=2> link.
+
+Line one  
+line two with <u>**bold** under</u> end.
+
+```cpp
+cout << "hello" << endl;
+```
+
+<img src="test.png" alt="raw" style="zoom:50%;" />
+
+1. one
+    1. nested **bold**
+2. two
+
+Term ==hi== ~~del~~ x^2^ H~2~O
+
+| a | b |
+|---|---|
+| `x` | &lt; |
+"""
+
+
+def _dump(node, depth=0, out=None):
+    """把节点树展开成可比较的列表"""
+    if node.name is None:
+        out.append((depth, None, str(node)))
+        return out
+    attrs = {key: node.get(key) for key in ("src", "href", "class", "alt", "style", "title")}
+    string = node.string
+    out.append((depth, node.name, attrs, None if string is None else str(string)))
+    for child in node.contents:
+        _dump(child, depth + 1, out)
+    return out
+
+
+@pytest.mark.parametrize("text", [get_test_file("test.md").read_text(encoding="utf-8"), TRICKY_MD])
+def test_tree_matches_html_backend(text):
+    """测试 md2tree 与 HTML + BeautifulSoup 得到的结构完全一致"""
+    body_tag = BeautifulSoup(md2html_str(text), 'html.parser').contents[2]
+    expected, actual = [], []
+    for child in body_tag.contents:
+        _dump(child, 0, expected)
+    for child in md2tree(text).contents:
+        _dump(child, 0, actual)
+    assert actual == expected
+
+
+def test_tree_node_lookup():
+    """测试 TreeNode 以属性形式查找子标签"""
+    body = md2tree("| a | b |\n|---|---|\n| 1 | 2 |\n")
+    table = body.find("table")
+    assert table.name == "table"
+    assert table.thead.tr.th.string == "a"
+    assert [td.string for td in table.tbody.find_all("td")] == ["1", "2"]
+    assert table.caption is None
+
+
+def test_empty_markdown_tree():
+    """测试空文本得到空的树"""
+    assert md2tree("  \n").contents == []
@@ -0,0 +1,73 @@
+import os
+import shutil
+
+import pytest
+
+from markdocx import ConversionStats, DirectoryResultCache, MarkDocx, MemoryResultCache
+from markdocx.provider.result_cache import ResultCache
+from . import LocalImageServer
+
+RESOURCES = os.path.join(os.path.dirname(__file__), "resources")
+MARKDOWN = "# 标题\n\n正文\n\n![图片](pic.png)\n"
+
+
+def test_memory_cache_hits_and_invalidation(tmp_path):
+    """测试相同输入直接返回缓存结果，本地图片或样式变化时重新转换"""
+    image = tmp_path / "pic.png"
+    shutil.copy(os.path.join(RESOURCES, "test.png"), image)
+    cache = MemoryResultCache()
+    converter = MarkDocx(result_cache=cache)
+
+    first = converter.convert_string(MARKDOWN, base_dir=tmp_path)
+    assert converter.convert_string(MARKDOWN, base_dir=tmp_path) is first
+    assert cache.stats == {"hits": 1, "misses": 1}
+
+    image.write_bytes(image.read_bytes() + b"\0")
+    converter.convert_string(MARKDOWN, base_dir=tmp_path)
+    assert cache.stats == {"hits": 1, "misses": 2}
+
+    other_style = MarkDocx(style_config={"normal": {"font": {"size": 20}}}, result_cache=cache)
+    other_style.convert_string(MARKDOWN, base_dir=tmp_path)
+    assert cache.stats == {"hits": 1, "misses": 3}
+
+
+def test_directory_cache_shared_and_capped(tmp_path):
+    """测试目录缓存可在转换器间共用，写出文件的结果与直接转换一致，超过容量时淘汰旧结果"""
+    cache_dir = tmp_path / "cache"
+    md_path = tmp_path / "doc.md"
+    md_path.write_text("# Hello\n", encoding="utf-8")
+    expected = MarkDocx().convert_string("# Hello\n")
+
+    MarkDocx(result_cache=str(cache_dir)).convert(md_path, tmp_path / "a.docx")
+    converter = MarkDocx(result_cache=str(cache_dir))
+    converter.convert(md_path, tmp_path / "b.docx")
+    assert converter.result_cache.stats == {"hits": 1, "misses": 0}
+    assert (tmp_path / "b.docx").read_bytes() == expected
+
+    cache = DirectoryResultCache(cache_dir, max_bytes=len(expected) + 10)
+    cache.put("other", b"x" * 20)
+    assert len(os.listdir(cache_dir)) == 1
+
+
+def test_conversions_with_diagnostics_are_not_cached():
+    """测试网络图片下载失败等产生警告的结果不存入缓存，之后的转换重新下载"""
+    cache = MemoryResultCache()
+    converter = MarkDocx(result_cache=cache)
+    with LocalImageServer() as server:
+        markdown = "![Missing](%s)\n" % server.url("missing.png")
+        converter.convert_string(markdown)
+        stats = ConversionStats()
+        converter.convert_string(markdown, stats=stats)
+        assert len(server.requests) == 2
+    assert cache.stats == {"hits": 0, "misses": 2}
+    assert len(stats.diagnostics) == 1
+
+
+def test_incomplete_cache_subclass_cannot_be_created():
+    """测试未实现 _get / _put 的子类在创建时就报错"""
+    class GetOnly(ResultCache):
+        def _get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnly()
@@ -0,0 +1,99 @@
+import http.client
+import io
+import json
+import shutil
+import threading
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+from urllib.parse import urlparse
+import pytest
+from docx import Document
+from markdocx.server import ConversionService, make_server
+from . import get_test_file
+
+
+@contextmanager
+def running_server(service):
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield "http://127.0.0.1:%d" % server.server_address[1]
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
+
+
+def _post(url: str, text: str):
+    return urllib.request.urlopen(urllib.request.Request(url, data=text.encode("utf-8")), timeout=30)
+
+
+def test_server_converts_with_style_id():
+    """测试服务按样式 id 转换并返回 .docx，未知样式返回 400"""
+    style = {"normal": {"font": {"default": "Arial", "size": 11}}}
+    with running_server(ConversionService({"report": style}, workers=2)) as url:
+        health = json.loads(urllib.request.urlopen(url + "/health").read())
+        assert health["styles"] == ["default", "report"]
+
+        for style_id in ("default", "report"):
+            response = _post(url + "/convert?style=" + style_id, "# Hello\n\nWorld")
+            assert response.status == 200
+            doc = Document(io.BytesIO(response.read()))
+            assert [p.text for p in doc.paragraphs] == ["Hello", "World"]
+        assert doc.styles["Normal"].font.name == "Arial"
+
+        with pytest.raises(urllib.error.HTTPError) as error:
+            _post(url + "/convert?style=missing", "# Hello")
+        assert error.value.code == 400
+
+
+def test_server_rejects_requests_over_queue_limit():
+    """测试正在处理和排队的请求数达到上限时返回 503"""
+    service = ConversionService(workers=1, max_queue=0)
+    with running_server(service) as url:
+        service._slots.acquire()  # 占用唯一的名额，模拟正在处理的请求
+        try:
+            with pytest.raises(urllib.error.HTTPError) as error:
+                _post(url + "/convert", "# Busy")
+            assert error.value.code == 503
+            assert error.value.headers["Retry-After"]
+        finally:
+            service._slots.release()
+        assert _post(url + "/convert", "# Free").status == 200
+
+
+@pytest.mark.parametrize("length", ["abc", "-1"])
+def test_server_rejects_invalid_content_length(length):
+    """测试非数字或负数的 Content-Length 返回 400，而不是断开连接或一直等待请求体"""
+    with running_server(ConversionService(workers=1)) as url:
+        connection = http.client.HTTPConnection(urlparse(url).netloc, timeout=10)
+        connection.putrequest("POST", "/convert")
+        connection.putheader("Content-Length", length)
+        connection.endheaders()
+        response = connection.getresponse()
+        assert response.status == 400
+        assert b"Content-Length" in response.read()
+        connection.close()
+
+
+def test_server_restricts_base_dir_to_image_root(tmp_path):
+    """测试请求的 base_dir 只能是图片根目录下的子目录，超出根目录或未配置根目录时返回 403"""
+    (tmp_path / "docs").mkdir()
+    shutil.copy(get_test_file("test.png"), tmp_path / "docs" / "logo.png")
+    with running_server(ConversionService(workers=1, image_root=str(tmp_path))) as url:
+        doc = Document(io.BytesIO(_post(url + "/convert?base_dir=docs", "![logo](logo.png)").read()))
+        assert len(doc.inline_shapes) == 1
+        doc = Document(io.BytesIO(_post(url + "/convert", "![logo](docs/logo.png)").read()))
+        assert len(doc.inline_shapes) == 1
+
+        for base_dir in ("/etc", "..", "docs/../.."):
+            with pytest.raises(urllib.error.HTTPError) as error:
+                _post(url + "/convert?base_dir=" + base_dir, "# Hello")
+            assert error.value.code == 403
+
+    with running_server(ConversionService(workers=1)) as url:
+        with pytest.raises(urllib.error.HTTPError) as error:
+            _post(url + "/convert?base_dir=" + str(tmp_path), "# Hello")
+        assert error.value.code == 403
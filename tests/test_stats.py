@@ -0,0 +1,64 @@
+import json
+
+from markdocx import ConversionStats, MarkDocx, cli
+
+MARKDOWN = """# 标题
+
+一段带[链接](https://example.com)和 **加粗** 的文字。
+
+| A | B |
+|---|---|
+| 1 | 2 |
+
+```python
+print("hi")
+```
+"""
+
+
+def test_stats_and_callback():
+    """测试每次转换的统计记入传入的 ConversionStats，并传给 on_stats 回调"""
+    reported = []
+    converter = MarkDocx(on_stats=reported.append)
+    stats = ConversionStats()
+    data = converter.convert_string(MARKDOWN, stats=stats)
+
+    assert reported == [stats]
+    assert list(stats.stages) == ["parse", "images", "render", "save"]
+    assert stats.blocks == 4
+    assert stats.bytes_written == len(data)
+    assert stats.markdown_bytes == len(MARKDOWN.encode("utf-8"))
+    elements = stats.to_dict()["elements"]
+    assert {name: elements[name]["count"] for name in ("heading", "link", "table", "code_block")} == \
+           {"heading": 1, "link": 1, "table": 1, "code_block": 1}
+    # 嵌套元素的耗时不重复计入外层
+    assert sum(entry["seconds"] for entry in elements.values()) <= stats.stages["render"]
+
+
+def test_profile_option(tmp_path):
+    """测试 --profile 把统计写成 JSON 文件"""
+    md_path = tmp_path / "doc.md"
+    md_path.write_text(MARKDOWN, encoding="utf-8")
+    profile = tmp_path / "profile.json"
+    assert cli.main([str(md_path), "-o", str(tmp_path / "doc.docx"), "--profile", str(profile)]) == 0
+
+    report = json.loads(profile.read_text(encoding="utf-8"))
+    assert report["input"] == str(md_path)
+    assert set(report["stages"]) == {"read", "parse", "images", "render", "save"}
+    assert report["bytes_written"] == (tmp_path / "doc.docx").stat().st_size
+
+
+def test_concurrent_conversions_keep_their_own_stats():
+    """测试多个线程共用一个转换器时，各次转换的统计互不覆盖"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    converter = MarkDocx()
+    documents = ["\n\n".join("段落 %d" % i for i in range(n)) for n in range(1, 9)]
+
+    def convert(markdown):
+        stats = ConversionStats()
+        converter.convert_string(markdown, stats=stats)
+        return stats.blocks
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        assert list(executor.map(convert, documents)) == list(range(1, 9))
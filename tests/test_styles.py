@@ -0,0 +1,85 @@
+import os
+import pytest
+from docx import Document
+from markdocx import MarkDocx
+from markdocx.provider import style_cache
+from markdocx.provider.style_manager import StyleManager
+
+STYLE_YAML = """
+normal:
+  font:
+    default: Arial
+    size: 11
+h1:
+  font:
+    size: 24
+"""
+
+
+@pytest.fixture
+def init_count(monkeypatch):
+    """统计 StyleManager.init_styles 的调用次数"""
+    calls = []
+    init_styles = StyleManager.init_styles
+
+    def counting(self):
+        calls.append(self)
+        return init_styles(self)
+
+    style_cache.clear_style_cache()
+    monkeypatch.setattr(StyleManager, "init_styles", counting)
+    yield calls
+    style_cache.clear_style_cache()
+
+
+def test_style_file_is_compiled_once(tmp_path, init_count):
+    """测试同一个样式文件只解析、编译一次，修改后重新编译"""
+    style_file = tmp_path / "style.yaml"
+    style_file.write_text(STYLE_YAML, encoding="utf-8")
+
+    for _ in range(3):
+        converter = MarkDocx(style_config=str(style_file))
+        converter.convert_string("# Title")
+    assert len(init_count) == 1
+    assert converter.style_config["h1"]["font"]["size"] == 24
+
+    style_file.write_text(STYLE_YAML.replace("24", "30"), encoding="utf-8")
+    os.utime(style_file, ns=(0, os.stat(style_file).st_mtime_ns + 10 ** 9))
+    assert MarkDocx(style_config=str(style_file)).style_config["h1"]["font"]["size"] == 30
+    assert len(init_count) == 2
+
+
+def test_compiled_style_matches_style_manager(init_count):
+    """测试注入编译好的 styles.xml 与直接用 StyleManager 设置样式的结果一致，且不修改传入的配置"""
+    conf = {"normal": {"font": {"default": "Arial", "size": 11}}}
+    expected = Document()
+    StyleManager(expected, {"normal": {"font": {"default": "Arial", "size": 11}}}).init_styles()
+
+    compiled = style_cache.compile_style(conf)
+    assert style_cache.compile_style(dict(conf)) is compiled
+    assert compiled.new_document().part._styles_part.blob == expected.part._styles_part.blob
+    assert conf == {"normal": {"font": {"default": "Arial", "size": 11}}}
+
+
+def test_compiled_style_file(tmp_path):
+    """测试 compile-style 生成的预编译样式：结果与 YAML 相同，加载时不导入 PyYAML"""
+    import subprocess
+    import sys
+    from markdocx.cli import main
+
+    style_file = tmp_path / "style.yaml"
+    style_file.write_text(STYLE_YAML, encoding="utf-8")
+    assert main(["compile-style", str(style_file)]) == 0
+    compiled_file = tmp_path / "style.mdxs"
+    assert compiled_file.exists()
+
+    from_yaml = MarkDocx(style_config=str(style_file)).template.new_document()
+    from_compiled = MarkDocx(style_config=str(compiled_file)).template.new_document()
+    assert from_compiled.part._styles_part.blob == from_yaml.part._styles_part.blob
+
+    code = ("import sys; from markdocx import MarkDocx; MarkDocx(style_config=%r).convert_string('# Hi'); "
+            "print('yaml' in sys.modules)" % str(compiled_file))
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+    env = dict(os.environ, PYTHONPATH=src + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env)
+    assert result.stdout.strip() == "False", result.stderr
@@ -0,0 +1,68 @@
+import io
+from docx import Document
+from markdocx import MarkDocx
+from markdocx.provider.table_builder import TableBuilder
+
+TEXTS = [
+    ["plain", " leading space", "tab\there"],
+    ["", "line\nbreak", "中文"],
+    ["only one cell"],
+]
+
+
+def test_table_builder_matches_python_docx():
+    """测试批量构建的表格与逐个单元格设置的 python-docx 结果完全一致"""
+    expected = Document().add_table(0, 3)
+    cells = expected.add_row().cells
+    for i, text in enumerate(["A", " B", ""]):
+        cells[i].paragraphs[0].add_run(text).bold = True
+    for texts in TEXTS:
+        cells = expected.add_row().cells
+        for i, text in enumerate(texts):
+            cells[i].text = text
+
+    table = Document().add_table(0, 3)
+    builder = TableBuilder(table)
+    builder.add_header(["A", " B", ""])
+    builder.add_rows(TEXTS)
+
+    assert table._tbl.xml == expected._tbl.xml
+
+
+def test_table_cells_with_inline_markup():
+    """测试含多个行内元素的单元格保留全部文字"""
+    md = "| Name | Note |\n|---|---|\n| **Jack** | very **big** deal |\n| Tom | |\n"
+    doc = Document(io.BytesIO(MarkDocx().convert_string(md)))
+    table = doc.tables[0]
+    assert [cell.text for cell in table.rows[0].cells] == ["Name", "Note"]
+    assert [cell.text for cell in table.rows[1].cells] == ["Jack", "very big deal"]
+    assert [cell.text for cell in table.rows[2].cells] == ["Tom", ""]
+    assert table.rows[0].cells[0].paragraphs[0].runs[0].bold
+
+
+def test_large_table_is_split_with_repeated_header():
+    """测试超大表格按行数拆分，每个分表都带重复的表头和固定列宽"""
+    from docx.oxml.ns import qn
+
+    def make_table(rows):
+        return "| Id | Description |\n|---|---|\n" + "".join(
+            "| %d | a much longer description for row %d |\n" % (i, i) for i in range(rows))
+
+    md = make_table(25)
+    style = {"normal": {}, "table": {"large-rows": 20, "chunk-rows": 10}}
+    doc = Document(io.BytesIO(MarkDocx(style_config=style).convert_string(md)))
+
+    assert [len(table.rows) for table in doc.tables] == [11, 11, 6]
+    for table in doc.tables:
+        tbl = table._tbl
+        assert table.rows[0].cells[0].text == "Id"
+        assert tbl.tr_lst[0].trPr.find(qn("w:tblHeader")) is not None
+        assert tbl.tblPr.find(qn("w:tblLayout")).get(qn("w:type")) == "fixed"
+        widths = [col.w for col in tbl.tblGrid.gridCol_lst]
+        assert widths[1] > widths[0] * 3
+    assert doc.tables[2].rows[-1].cells[0].text == "24"
+
+    # 未超过行数的表格不受影响
+    doc = Document(io.BytesIO(MarkDocx(style_config=style).convert_string(make_table(20))))
+    assert len(doc.tables) == 1
+    assert doc.tables[0]._tbl.tblPr.find(qn("w:tblLayout")) is None